@@ -0,0 +1,91 @@
+"""reorder person columns for row alignment
+
+Revision ID: 16f90db53103
+Revises: ab3f16c91c3f
+Create Date: 2026-10-15 17:14:29.356710
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '16f90db53103'
+down_revision: Union[str, None] = 'ab3f16c91c3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Колонки фиксированной длины идут первыми, от большего выравнивания к
+# меньшему, затем строки переменной длины: так в строке нет байтов
+# выравнивания между полями
+_FIXED_FIRST = (
+    'kind', 'reg_date', 'uk', 'active', 'is_moscow',
+    'tax_number', 'ogrn', 'full_name', 'short_name', 'legal_address', 'fact_address',
+    'category', 'okopf', 'okvad', 'region', 'support_type',
+)
+# Порядок колонок до перестройки, в котором их добавляли прошлые миграции
+_DECLARATION_ORDER = (
+    'kind', 'tax_number', 'full_name', 'short_name', 'legal_address', 'fact_address',
+    'reg_date', 'active', 'category', 'okopf', 'okvad', 'region', 'uk', 'support_type',
+    'ogrn', 'is_moscow',
+)
+
+
+def _person_columns() -> dict:
+    return {
+        'kind': sa.Column('kind', sa.Integer(), nullable=False),
+        'reg_date': sa.Column('reg_date', sa.Date(), nullable=True),
+        'uk': sa.Column('uk', sa.SmallInteger(), nullable=False,
+                        comment='Участник кластера(uk=1-участник, uk=0-нет)'),
+        'active': sa.Column('active', sa.Boolean(), server_default=sa.true(), nullable=False),
+        'is_moscow': sa.Column('is_moscow', sa.Boolean(),
+                               sa.Computed("region ILIKE '%москва%'", persisted=True),
+                               comment="Регион содержит 'москва'"),
+        'tax_number': sa.Column('tax_number', sa.String(), nullable=False),
+        'ogrn': sa.Column('ogrn', sa.String(), nullable=False, comment='ОГРН организации'),
+        'full_name': sa.Column('full_name', sa.String(), nullable=True),
+        'short_name': sa.Column('short_name', sa.String(), nullable=True),
+        'legal_address': sa.Column('legal_address', sa.String(), nullable=True),
+        'fact_address': sa.Column('fact_address', sa.String(), nullable=True),
+        'category': sa.Column('category', sa.String(), nullable=True),
+        'okopf': sa.Column('okopf', sa.String(), nullable=True),
+        'okvad': sa.Column('okvad', sa.String(), nullable=True),
+        'region': sa.Column('region', sa.String(), nullable=True),
+        'support_type': sa.Column('support_type', sa.String(), nullable=True),
+    }
+
+
+def _rebuild_person(order: Sequence[str]) -> None:
+    """
+    Пересоздает таблицу person с заданным порядком колонок.
+
+    Postgres не умеет переставлять колонки существующей таблицы, поэтому
+    данные копируются в новую таблицу, после чего она занимает место старой
+    вместе с ограничениями, индексами и внешним ключом из ownership.
+    """
+    columns = _person_columns()
+    op.create_table('person_new', *(columns[name] for name in order))
+    copied = ', '.join(name for name in order if name != 'is_moscow')
+    op.execute(f'INSERT INTO person_new ({copied}) SELECT {copied} FROM person')
+
+    op.drop_constraint('ownership_person_tax_number_fkey', 'ownership', type_='foreignkey')
+    op.drop_table('person')
+    op.rename_table('person_new', 'person')
+
+    op.create_primary_key('person_pkey', 'person', ['tax_number'])
+    op.create_unique_constraint('person_ogrn_key', 'person', ['ogrn'])
+    op.create_index('ix_person_kind_category', 'person', ['kind', 'category'], unique=False, postgresql_include=['tax_number'])
+    op.create_index('ix_person_moscow_stats', 'person', ['kind', 'category'], unique=False, postgresql_include=['tax_number', 'uk', 'support_type'], postgresql_where=sa.text('is_moscow'))
+    op.create_index('ix_person_active_partial', 'person', ['kind'], unique=False, postgresql_where=sa.text('active'))
+    op.create_foreign_key('ownership_person_tax_number_fkey', 'ownership', 'person', ['person_tax_number'], ['tax_number'], ondelete='CASCADE')
+
+
+def upgrade() -> None:
+    _rebuild_person(_FIXED_FIRST)
+
+
+def downgrade() -> None:
+    _rebuild_person(_DECLARATION_ORDER)
@@ -4,8 +4,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from starlette import status
-from fastapi.responses import Response
 
+from app.core.cache import drop_all_cached
 from app.core.db import get_async_session
 from app.crud.filter import filter_crud
 from app.schemas.filter import FilterDB, FilterCreate
@@ -13,7 +13,14 @@ from app.schemas.filter import FilterDB, FilterCreate
 router = APIRouter()
 
 
-@router.post("/filters", response_model=FilterDB, status_code=status.HTTP_201_CREATED)
+# Кэш ответов хранит результаты по filter_id, в том числе пустые для еще не
+# созданного фильтра, поэтому создание и удаление фильтра сбрасывают его
+@router.post(
+    "/filters",
+    response_model=FilterDB,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[drop_all_cached]
+)
 async def create_filter(name: str, file: UploadFile, session: AsyncSession = Depends(get_async_session)):
     """
     Создает новый фильтр на основе загруженного Excel-файла.
@@ -91,7 +98,11 @@ async def update_filter(filter_id: int, name: str, session: AsyncSession = Depen
     return await filter_crud.update_filter_name(session, filter_id, name)
 
 
-@router.delete("/filters/{filter_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/filters/{filter_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[drop_all_cached]
+)
 async def delete_filter(filter_id: int, session: AsyncSession = Depends(get_async_session)):
     """
     Удаляет существующий фильтр.
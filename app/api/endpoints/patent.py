@@ -1,33 +1,44 @@
-import asyncio
 import logging
+import os
 from http import HTTPStatus
-from io import BytesIO
 from typing import Optional
 
-from aiocache import cached, Cache
+from celery.result import AsyncResult
 from fastapi import APIRouter, Depends, HTTPException, UploadFile
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, ORJSONResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette import status
 
-from app.api.validators import check_patent_exists
+from app.api.validators import check_cursor_params, check_patent_exists
+from app.celery_worker import celery_app
+from app.core.cache import CacheConfig, drop_all_cached
 from app.core.config import settings
 from app.core.db import get_async_session
+from app.core.responses import TypeAdapterResponse
 from app.crud.patent import patent_crud
-from app.crud.patents_export import get_export_patent_file, export_patents_task
+from app.crud.patents_export import (
+    XLSX_MEDIA_TYPE,
+    create_export_patent_file,
+    export_patents_task,
+    get_export_statement,
+)
 from app.models import Patent
 from app.patent_parser.parser import create_upload_file
 from app.schemas.patent import (
+    ExportTask,
+    ExportTaskStatus,
     PatentAdditionalFields,
     PatentCreate,
     PatentDB,
     PatentUpdate,
     PatentsList,
     PatentsStats,
+    patent_adapter,
+    patents_list_adapter,
+    patents_stats_adapter,
 )
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.DEBUG)
 
 router = APIRouter()
 
@@ -35,22 +46,17 @@ router = APIRouter()
 @router.get(
     '/patents',
     response_model=PatentsList,
-    status_code=status.HTTP_200_OK
+    status_code=HTTPStatus.OK,
+    dependencies=[Depends(CacheConfig(max_age=settings.cache_ttl))]
 )
-# @cached(
-#     ttl=settings.cache_ttl,
-#     cache=Cache.MEMORY,
-#     key_builder=lambda *args, **kwargs: (
-#             f"patents:{kwargs.get('page')}:{kwargs.get('pagesize')}:"
-#             f"{kwargs.get('filter_id')}:{kwargs.get('kind')}:{kwargs.get('actual')}"
-#     )
-# )
 async def list_patents(
         page: int = 1,
         pagesize: int = 10,
         filter_id: Optional[int] = None,
         kind: Optional[int] = None,
         actual: Optional[bool] = None,
+        after_reg_number: Optional[int] = None,
+        after_kind: Optional[int] = None,
         session: AsyncSession = Depends(get_async_session),
 ):
     """
@@ -67,40 +73,48 @@ async def list_patents(
     - **actual** (bool, optional): Фильтр по актуальности патента:
         * true - только действующие патенты
         * false - только недействующие патенты
+    - **after_reg_number** (int, optional): Курсор keyset-пагинации: регистрационный номер
+        последнего патента предыдущей страницы (для первой страницы - 0). Если указан, **page** игнорируется.
+    - **after_kind** (int, optional): Курсор keyset-пагинации: тип последнего патента предыдущей страницы
+        (для первой страницы - 0). Передается только вместе с **after_reg_number**, иначе ответ 422.
+
+    Keyset-страницы упорядочены по (reg_number, kind), а страницы по **page** - по
+    (actual desc, kind, reg_number), поэтому при смене режима порядок патентов меняется.
 
     Returns:
     - **PatentsList**: Объект, содержащий:
         * total (int): Общее количество патентов
-        * items (List[Patent]): Список патентов с информацией о владельцах
+        * items (List[PatentListItem]): Список патентов без владельцев; владельцы
+          возвращаются карточкой патента /patents/{kind}/{reg_number}
+        * next_cursor (PatentCursor, optional): Ключ последнего патента страницы при keyset-пагинации
     """
     logger.debug(
-        f"Fetching patents with page={page}, pagesize={pagesize}, filter_id={filter_id}, kind={kind}, actual={actual}")
+        "Fetching patents with page=%s, pagesize=%s, filter_id=%s, kind=%s, actual=%s",
+        page, pagesize, filter_id, kind, actual)
+    check_cursor_params(after_reg_number, after_kind)
 
     if filter_id:
-        patents_with_filter = await patent_crud.get_patents_list_with_filter(session, page, pagesize, filter_id)
-        return patents_with_filter
-
-    patents = await patent_crud.get_patents_list(session, page, pagesize, kind, actual)
-
-    return patents
-
+        patents = await patent_crud.get_patents_list_with_filter(
+            session, page, pagesize, filter_id, after_reg_number, after_kind)
+    else:
+        patents = await patent_crud.get_patents_list(
+            session, page, pagesize, kind, actual, after_reg_number, after_kind)
 
+    # Данные из базы не валидируются повторно: схема строится через
+    # model_construct и сериализуется одним проходом pydantic-core
+    return TypeAdapterResponse(PatentsList.from_rows(patents), patents_list_adapter)
 
 
 @router.get(
     '/patents/stats',
     response_model=PatentsStats,
-    status_code=status.HTTP_200_OK
-)
-@cached(
-    ttl=settings.cache_ttl,
-    cache=Cache.MEMORY,
-    key_builder=lambda *args, **kwargs: f"patents_stats:{kwargs.get('filter_id')}"
+    status_code=HTTPStatus.OK,
+    dependencies=[Depends(CacheConfig(max_age=settings.cache_ttl))]
 )
 async def get_patents_stats(
         filter_id: Optional[int] = None,
         session: AsyncSession = Depends(get_async_session)
-) -> PatentsStats:
+) -> TypeAdapterResponse:
     """
    Получить статистику по патентам.
 
@@ -116,20 +130,92 @@ async def get_patents_stats(
        * total_ru_with_holders (int): Количество российских патентов с владельцами
        * with_holders_percent (int): Процент патентов с указанными владельцами
        * ru_with_holders_percent (int): Процент российских патентов с владельцами
-       * by_author_count (Dict): Распределение по количеству авторов
-       * by_patent_kind (Dict): Распределение по типам патентов
+       * by_author_count (List[StatItem]): Распределение по количеству авторов ({name, count})
+       * by_patent_kind (List[KindStatItem]): Распределение по типам патентов ({kind, count})
     """
     logger.debug(
-        f"Fetching patents_stats with filter_id={filter_id}")
+        "Fetching patents_stats with filter_id=%s", filter_id)
 
     stats = await patent_crud.get_stats(session, filter_id)
-    return stats
+    return TypeAdapterResponse(PatentsStats.build_trusted(**stats), patents_stats_adapter)
+
+
+@router.post(
+    "/patents/export",
+    response_model=ExportTask,
+    status_code=HTTPStatus.ACCEPTED
+)
+async def start_export_patents(
+        filter_id: Optional[int] = None,
+        actual: Optional[str] = None,
+        kind: Optional[int] = None,
+) -> ExportTask:
+    """
+    Поставить в очередь выгрузку патентов в формате XLSX.
+
+    Parameters:
+    - **filter_id** (int, optional): ID фильтра для экспорта патентов по списку ИНН.
+    - **actual** (str, optional): "Актуально" или "Неактуально".
+    - **kind** (int, optional): Тип патента для фильтрации.
+
+    Returns:
+    - **ExportTask**: Идентификатор задачи для GET /patents/export/{task_id}
+    """
+    # Некорректные параметры отклоняются сразу, а не в воркере
+    get_export_statement(filter_id, actual, kind)
+
+    task = export_patents_task.delay(filter_id, actual, kind)
+    return ExportTask(task_id=task.id)
+
+
+# Маршрут объявлен до '/patents/{patent_kind}/{patent_reg_number}', иначе запрос попадет туда
+@router.get(
+    "/patents/export/{task_id}",
+    response_class=FileResponse,
+    responses={HTTPStatus.ACCEPTED: {"model": ExportTaskStatus}}
+)
+async def get_export_patents_result(task_id: str):
+    """
+    Получить результат выгрузки, поставленной через POST /patents/export.
+
+    Parameters:
+    - **task_id** (str): Идентификатор задачи.
+
+    Returns:
+    - **FileResponse**: XLSX-файл, если выгрузка готова
+    - **ExportTaskStatus**: Статус "pending" с кодом 202, пока задача выполняется
+
+    Note:
+    - Файл удаляется после отправки, повторный запрос вернет 404
+    - Воркер Celery и приложение должны использовать общий каталог settings.export_dir
+    """
+    result = AsyncResult(task_id, app=celery_app)
+    if not result.ready():
+        return ORJSONResponse({"status": "pending"}, status_code=HTTPStatus.ACCEPTED)
+
+    if not result.successful():
+        raise HTTPException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+            detail="Не удалось сформировать выгрузку."
+        )
+
+    path = result.result
+    if not os.path.exists(path):
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Файл выгрузки не найден.")
+
+    return FileResponse(
+        path,
+        media_type=XLSX_MEDIA_TYPE,
+        filename="patents_export.xlsx",
+        background=BackgroundTask(os.unlink, path)
+    )
 
 
 @router.post(
     '/patents',
     response_model=PatentDB,
-    status_code=status.HTTP_201_CREATED
+    status_code=HTTPStatus.CREATED,
+    dependencies=[drop_all_cached]
 )
 async def create_patent(
         patent: PatentCreate,
@@ -156,17 +242,16 @@ async def create_patent(
     return new_patent
 
 
-
 @router.get(
    '/patents/{patent_kind}/{patent_reg_number}',
    response_model=PatentAdditionalFields,
-   status_code=status.HTTP_200_OK
+   status_code=HTTPStatus.OK
 )
 async def get_patent(
        patent_kind: int,
        patent_reg_number: int,
        session: AsyncSession = Depends(get_async_session)
-) -> PatentAdditionalFields:
+) -> TypeAdapterResponse:
     """
     Получить детальную информацию о патенте.
 
@@ -185,13 +270,14 @@ async def get_patent(
     """
 
     patent = await patent_crud.get_patent(session, patent_kind, patent_reg_number)
-    return patent
+    return TypeAdapterResponse(PatentAdditionalFields.from_row(patent), patent_adapter)
 
 
 @router.patch(
     '/patents/{patent_kind}/{patent_reg_number}',
     response_model=PatentDB,
-    status_code=status.HTTP_200_OK
+    status_code=HTTPStatus.OK,
+    dependencies=[drop_all_cached]
 )
 async def update_patent(
         patent_kind: int,
@@ -219,7 +305,8 @@ async def update_patent(
 
 @router.delete(
     '/patents/{patent_kind}/{patent_reg_number}',
-    status_code=status.HTTP_204_NO_CONTENT
+    status_code=HTTPStatus.NO_CONTENT,
+    dependencies=[drop_all_cached]
 )
 async def delete_patent(
         patent_kind: int,
@@ -249,7 +336,6 @@ async def delete_patent(
     await patent_crud.delete_object(patent, session)
 
 
-
 @router.post(
     "/uploadfile/",
     status_code=HTTPStatus.OK
@@ -273,13 +359,12 @@ async def send_patent_file(file: UploadFile):
 
 @router.get(
     "/patents/export",
-    response_class=StreamingResponse
+    response_class=FileResponse
 )
 async def export_patents(
         filter_id: Optional[int] = None,
         actual: Optional[str] = None,
         kind: Optional[int] = None,
-        session: AsyncSession = Depends(get_async_session)
 ):
     """
      Экспортировать данные о патентах в формате XLSX.
@@ -296,28 +381,19 @@ async def export_patents(
          * 3 - Промышленный образец
 
      Returns:
-     - **StreamingResponse**: Поток с XLSX-файлом
+     - **FileResponse**: XLSX-файл
 
      Note:
-     - Без фильтров экспортируются первые 10000 патентов
-
-
+     - Выгружаются все патенты, подходящие под фильтры, без ограничения количества строк
+     - Файл отдается через sendfile и удаляется после отправки
      """
-    task = export_patents_task.delay(filter_id, actual, kind)
-
-    try:
-        result = task.get(timeout=120)  # Синхронное ожидание с тайм-аутом
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Ошибка при экспорте данных: " + str(e))
-
-    # Убедитесь, что `result` является потоком данных
-    return StreamingResponse(
-        BytesIO(result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        headers={"Content-Disposition": "attachment; filename=patents_export.xlsx"}
+    # Некорректные параметры отклоняются до запуска выгрузки в пуле процессов
+    get_export_statement(filter_id, actual, kind)
+    path = await create_export_patent_file(filter_id, actual, kind)
+
+    return FileResponse(
+        path,
+        media_type=XLSX_MEDIA_TYPE,
+        filename="patents_export.xlsx",
+        background=BackgroundTask(os.unlink, path)
     )
-
-
-    #return await get_export_patent_file(session, filter_id, actual, kind)
-
-
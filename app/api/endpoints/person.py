@@ -1,5 +1,4 @@
-from aiocache import cached, Cache
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
 from http import HTTPStatus
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -8,8 +7,10 @@ from typing import Optional
 import logging
 
 from app.api.validators import check_person_exists
+from app.core.cache import CacheConfig, drop_all_cached
 from app.core.config import settings
 from app.core.db import get_async_session
+from app.core.responses import TypeAdapterResponse
 from app.crud.person import person_crud
 from app.models import Person
 from app.schemas.person import (
@@ -17,10 +18,10 @@ from app.schemas.person import (
     PersonAdditionalFields,
     PersonCreate,
     PersonDB,
-    PersonUpdate, PersonsAllStats, PersonsMskStats,
+    PersonUpdate, PersonsAllStats, PersonsMskStats, person_adapter, persons_list_adapter,
+    persons_all_stats_adapter, persons_msk_stats_adapter,
 )
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.DEBUG)
 
 router = APIRouter()
 
@@ -28,14 +29,8 @@ router = APIRouter()
 @router.get(
     "/persons",
     response_model=PersonsList,
-    status_code=HTTPStatus.OK
-)
-@cached(
-    ttl=settings.cache_ttl,
-    cache=Cache.MEMORY,
-    key_builder=lambda *args, **kwargs: (
-            f"persons:{kwargs.get('page')}:{kwargs.get('pagesize')}:"
-            f"{kwargs.get('kind')}:{kwargs.get('active')}:{kwargs.get('category')}")
+    status_code=HTTPStatus.OK,
+    dependencies=[Depends(CacheConfig(max_age=settings.cache_ttl))]
 )
 async def patents_stats(
         session: AsyncSession = Depends(get_async_session),
@@ -44,7 +39,7 @@ async def patents_stats(
         # kind: Optional[int] = None,
         # active: Optional[bool] = None,
         # category: Optional[int] = None
-) -> PersonsList:
+) -> TypeAdapterResponse:
 
     """
     Получение статистики по патентам в разрезе различных категорий.
@@ -55,25 +50,21 @@ async def patents_stats(
     * Топ-5 подкатегорий МПК (Международная патентная классификация) + прочие
     """
     persons = await person_crud.get_patents_stats(session)
-    return persons
+    # Агрегаты посчитаны сервером и не валидируются повторно
+    return TypeAdapterResponse(PersonsList.build_trusted(**persons), persons_list_adapter)
 
 
 
 @router.get(
     "/persons/all_stats",
     response_model=PersonsAllStats,
-    status_code=HTTPStatus.OK
+    status_code=HTTPStatus.OK,
+    dependencies=[Depends(CacheConfig(max_age=settings.cache_ttl))]
 )
-# @cached(
-#     ttl=settings.cache_ttl,
-#     cache=Cache.MEMORY,
-#     key_builder=lambda *args, **kwargs: (
-#             f"persons_stats:{kwargs.get('filter_id')}:")
-# )
 async def get_persons_all_stats(
         filter_id: Optional[int] = None,
         session: AsyncSession = Depends(get_async_session)
-) -> PersonsAllStats:
+) -> TypeAdapterResponse:
     """
     Получение общей статистики по всем лицам.
 
@@ -81,21 +72,22 @@ async def get_persons_all_stats(
         filter_id (int, опционально): Идентификатор фильтра для списка ИНН.
     """
     logger.debug(
-        f"Fetching persons_stats with filter_id={filter_id}")
+        "Fetching persons_stats with filter_id=%s", filter_id)
 
     stats = await person_crud.get_all_stats(session, filter_id)
-    return stats
+    return TypeAdapterResponse(PersonsAllStats.build_trusted(**stats), persons_all_stats_adapter)
 
 
 @router.get(
     "/persons/msk_stats",
     response_model=PersonsMskStats,
-    status_code=HTTPStatus.OK
+    status_code=HTTPStatus.OK,
+    dependencies=[Depends(CacheConfig(max_age=settings.cache_ttl))]
 )
 async def get_persons_msk_stats(
         filter_id: Optional[int] = None,
         session: AsyncSession = Depends(get_async_session)
-) -> PersonsMskStats:
+) -> TypeAdapterResponse:
     """
     Получение статистики по лицам, зарегистрированным в Москве.
 
@@ -107,16 +99,17 @@ async def get_persons_msk_stats(
         PersonsStats: словарь со статистикой.
     """
     logger.debug(
-        f"Fetching persons_stats with filter_id={filter_id}")
+        "Fetching persons_stats with filter_id=%s", filter_id)
 
     stats = await person_crud.get_msk_stats(session, filter_id)
-    return stats
+    return TypeAdapterResponse(PersonsMskStats.build_trusted(**stats), persons_msk_stats_adapter)
 
 
 @router.post(
     "/persons",
     response_model=PersonDB,
-    status_code=HTTPStatus.CREATED
+    status_code=HTTPStatus.CREATED,
+    dependencies=[drop_all_cached]
 )
 async def create_person(
         person: PersonCreate,
@@ -158,7 +151,7 @@ async def create_person(
 async def get_person(
         person_tax_number: str,
         session: AsyncSession = Depends(get_async_session)
-) -> PersonAdditionalFields:
+) -> TypeAdapterResponse:
     """
     Получение подробной информации о лице по ИНН.
 
@@ -174,7 +167,7 @@ async def get_person(
     """
 
     person = await person_crud.get_person(session, person_tax_number)
-    return person
+    return TypeAdapterResponse(PersonAdditionalFields.from_row(person), person_adapter)
 
 
 
@@ -182,7 +175,8 @@ async def get_person(
 @router.patch(
     '/persons/{person_tax_number}',
     response_model=PersonDB,
-    status_code=HTTPStatus.OK
+    status_code=HTTPStatus.OK,
+    dependencies=[drop_all_cached]
 )
 async def update_person(
         person_tax_number: str,
@@ -208,7 +202,11 @@ async def update_person(
 
 
 
-@router.delete('/persons/{person_tax_number}', status_code=HTTPStatus.NO_CONTENT)
+@router.delete(
+    '/persons/{person_tax_number}',
+    status_code=HTTPStatus.NO_CONTENT,
+    dependencies=[drop_all_cached]
+)
 async def delete_person(
         person_tax_number: str,
         session: AsyncSession = Depends(get_async_session)
@@ -1,4 +1,5 @@
 from http import HTTPStatus
+from typing import Optional
 
 from fastapi import HTTPException
 from sqlalchemy import select
@@ -58,3 +59,23 @@ async def check_person_exists(
         )
     return get_object.scalars().first()
 
+
+def check_cursor_params(after_reg_number: Optional[int], after_kind: Optional[int]) -> None:
+    """
+    Проверяет, что курсор keyset-пагинации передан целиком.
+
+    Ключ патента состоит из пары (reg_number, kind), поэтому без after_kind
+    следующая страница повторила бы патенты с тем же регистрационным номером.
+
+    Args:
+        after_reg_number (Optional[int]): Регистрационный номер из курсора.
+        after_kind (Optional[int]): Тип патента из курсора.
+
+    Raises:
+        HTTPException: Исключение с кодом 422, если передан только один параметр курсора.
+    """
+    if (after_reg_number is None) != (after_kind is None):
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail="Параметры after_reg_number и after_kind передаются только вместе."
+        )
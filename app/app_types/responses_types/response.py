@@ -1,4 +1,4 @@
-from typing import TypedDict, Any
+from typing import TypedDict, Any, Optional
 
 class PatentHolder(TypedDict):
     """Структура данных держателя патента."""
@@ -6,10 +6,17 @@ class PatentHolder(TypedDict):
     full_name: str
 
 
+class PatentCursor(TypedDict):
+    """Ключ последнего патента страницы для keyset-пагинации."""
+    kind: int
+    reg_number: int
+
+
 class PatentListResponse(TypedDict):
     """Ответ API со списком патентов."""
     total: int
     items: list[dict[str, Any]]
+    next_cursor: Optional[PatentCursor]
 
 
 class PatentStatsResponse(TypedDict):
@@ -20,13 +27,17 @@ class PatentStatsResponse(TypedDict):
     total_ru_with_holders: int
     with_holders_percent: int
     ru_with_holders_percent: int
-    by_author_count: dict[str, int]
-    by_patent_kind: dict[int, int]
+    by_author_count: list["StatsItem"]
+    by_patent_kind: list["KindStatsItem"]
 
 class StatsItem(TypedDict):
     name: str
     count: int
 
+class KindStatsItem(TypedDict):
+    kind: int
+    count: int
+
 class FromPersonPatentStatsResponse(TypedDict):
     okopf_stats: list[StatsItem]
     okvad_stats: list[StatsItem]
@@ -1,5 +1,7 @@
 from celery import Celery
 
+from app.core.config import settings
+
 
 celery_app = Celery(
     'background_tasks',
@@ -7,5 +9,19 @@ celery_app = Celery(
     backend="redis://localhost:6379/0"
 )
 
-celery_app.conf.update(result_expires=60)
-celery_app.autodiscover_tasks(['app.crud.patents_export.py'])
\ No newline at end of file
+celery_app.conf.update(
+    # Результат выгрузки (путь к файлу) должен дожить до опроса клиентом
+    result_expires=settings.export_result_ttl,
+    imports=('app.crud.patents_export',),
+    # Выгрузки долгие: воркер берет следующую задачу только после завершения текущей
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    # Файлы, которые так и не скачали, удаляются после истечения результата задачи;
+    # расписание выполняет celery beat
+    beat_schedule={
+        'cleanup-export-files': {
+            'task': 'app.crud.patents_export.cleanup_export_files',
+            'schedule': 3600,
+        },
+    },
+)
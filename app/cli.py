@@ -1,15 +1,15 @@
 from dotenv import load_dotenv
 import os
 import pathlib
-from typing import Optional, Tuple
 
-import pandas as pd
 from sqlalchemy import create_engine, func, select
 from sqlalchemy.orm import Session
 import tqdm
 import typer
 from typing_extensions import Annotated
 
+from app.core.cache import CACHED_PATHS, drop_cached_responses
+from app.core.config import settings
 from app.models import Ownership, Patent, Person
 from app.parsers import OwnershipParser, PatentParser, PersonParser
 
@@ -86,6 +86,9 @@ def _process_file(
             print(f"Error while trying to insert portion #{i} of data to table: {e}")
             error += 1 * commit_every
 
+    if success:
+        drop_cached_responses(settings.cache_redis_url, CACHED_PATHS)
+
     print("Completed")
     print(f"Inserted {success} records, failed to insert {error} records")
 
@@ -0,0 +1,345 @@
+"""Кэширование готовых HTTP-ответов на уровне ASGI."""
+import hashlib
+import logging
+import time
+from fnmatch import fnmatch
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import orjson
+from redis import Redis as SyncRedis
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from fastapi import Depends
+from fastapi.dependencies.utils import get_flat_dependant
+from fastapi.routing import APIRoute
+from starlette.datastructures import QueryParams
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class CacheConfig:
+    """
+    Зависимость-маркер: ответ маршрута кэшируется ResponseCacheMiddleware.
+
+    Пример:
+        @router.get('/patents/stats', dependencies=[Depends(CacheConfig(max_age=60))])
+
+    Args:
+        max_age (int): Время жизни записи в кэше в секундах.
+    """
+
+    def __init__(self, max_age: int):
+        self.max_age = max_age
+
+    async def __call__(self) -> None:
+        return None
+
+
+class CacheDropConfig:
+    """
+    Зависимость-маркер: успешный запрос к маршруту сбрасывает записи кэша.
+
+    Пример:
+        @router.post('/patents', dependencies=[Depends(CacheDropConfig(paths=['/patents*']))])
+
+    Args:
+        paths (Sequence[str]): Шаблоны путей в формате fnmatch, записи которых удаляются.
+    """
+
+    def __init__(self, paths: Sequence[str]):
+        self.paths = list(paths)
+
+    async def __call__(self) -> None:
+        return None
+
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_PREFIX = 'response-cache:'
+# Шаблоны путей всех кэшируемых ответов: запись любых данных сбрасывает их целиком
+CACHED_PATHS = ('/patents*', '/persons*')
+# Зависимость для маршрутов, изменяющих данные
+drop_all_cached = Depends(CacheDropConfig(paths=CACHED_PATHS))
+
+CachedResponse = Tuple[int, List[Tuple[bytes, bytes]], bytes]
+# Имена query-параметров маршрута и строковые значения по умолчанию
+QueryDefaults = Tuple[Tuple[str, str], ...]
+IndexedRoute = Tuple[APIRoute, Optional[CacheConfig], Optional[CacheDropConfig], QueryDefaults]
+
+
+class MemoryStorage:
+    """Хранилище ответов в памяти процесса."""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[float, CachedResponse]] = {}
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return response
+
+    async def set(self, key: str, response: CachedResponse, ttl: int) -> None:
+        now = time.monotonic()
+        expired = [k for k, (expires_at, _) in self._data.items() if expires_at < now]
+        for k in expired:
+            del self._data[k]
+        self._data[key] = (now + ttl, response)
+
+    async def drop(self, patterns: Sequence[str]) -> None:
+        for key in list(self._data):
+            path = key.split('|', 1)[0]
+            if any(fnmatch(path, pattern) for pattern in patterns):
+                self._data.pop(key, None)
+
+
+class RedisStorage:
+    """
+    Хранилище ответов в Redis, общее для всех воркеров приложения.
+
+    Ответ хранится в хэше с полями status, headers и body. Ошибки Redis не
+    прерывают обработку запроса: чтение считается промахом, запись и сброс
+    пропускаются.
+
+    Args:
+        redis (Redis): Клиент redis.asyncio со своим пулом соединений.
+        prefix (str): Префикс ключей кэша.
+    """
+
+    # Количество ключей, которое SCAN возвращает за одну итерацию при сбросе
+    scan_count = 500
+
+    def __init__(self, redis: Redis, prefix: str = RESPONSE_CACHE_PREFIX):
+        self.redis = redis
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, max_connections: int = 20) -> 'RedisStorage':
+        return cls(Redis.from_url(url, max_connections=max_connections))
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            entry = await self.redis.hgetall(self.prefix + key)
+        except RedisError:
+            logger.warning("Response cache read failed for %s", key, exc_info=True)
+            return None
+        if not entry:
+            return None
+        headers = [
+            (name.encode('latin-1'), value.encode('latin-1'))
+            for name, value in orjson.loads(entry[b'headers'])
+        ]
+        return int(entry[b'status']), headers, entry[b'body']
+
+    async def set(self, key: str, response: CachedResponse, ttl: int) -> None:
+        status, headers, body = response
+        mapping = {
+            'status': status,
+            'headers': orjson.dumps([(name.decode('latin-1'), value.decode('latin-1')) for name, value in headers]),
+            'body': body,
+        }
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                await pipe.hset(self.prefix + key, mapping=mapping).expire(self.prefix + key, ttl).execute()
+        except RedisError:
+            logger.warning("Response cache write failed for %s", key, exc_info=True)
+
+    async def drop(self, patterns: Sequence[str]) -> None:
+        try:
+            for pattern in patterns:
+                # Ключ имеет вид "<путь>|<параметры>", шаблон применяется к пути
+                keys = [key async for key in self.redis.scan_iter(
+                    match=f'{self.prefix}{pattern}|*', count=self.scan_count)]
+                if keys:
+                    await self.redis.unlink(*keys)
+        except RedisError:
+            logger.warning("Response cache invalidation failed for %s", patterns, exc_info=True)
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+def drop_cached_responses(url: str, patterns: Sequence[str], prefix: str = RESPONSE_CACHE_PREFIX) -> None:
+    """
+    Синхронно удаляет из Redis записи кэша ответов по шаблонам путей.
+
+    Используется вне приложения, например загрузчиками CLI после записи данных
+    напрямую в базу, минуя маршруты с CacheDropConfig.
+
+    Args:
+        url (str): Адрес Redis с кэшем ответов.
+        patterns (Sequence[str]): Шаблоны путей в формате fnmatch.
+        prefix (str): Префикс ключей кэша.
+    """
+    redis = SyncRedis.from_url(url)
+    try:
+        for pattern in patterns:
+            keys = list(redis.scan_iter(match=f'{prefix}{pattern}|*', count=RedisStorage.scan_count))
+            if keys:
+                redis.unlink(*keys)
+    except RedisError:
+        logger.warning("Response cache invalidation failed for %s", patterns, exc_info=True)
+    finally:
+        redis.close()
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI-middleware, кэширующее уже сериализованные ответы GET-маршрутов.
+
+    Маршруты с зависимостью CacheConfig индексируются при первом запросе.
+    При попадании в кэш тело ответа отдается без разрешения зависимостей,
+    валидации pydantic и повторного кодирования JSON. Маршруты с
+    CacheDropConfig после успешного ответа удаляют записи по шаблонам путей.
+
+    Кэшируемые ответы получают строгий ETag; если он совпадает с заголовком
+    If-None-Match запроса, клиенту отдается 304 без тела.
+
+    Записи сбрасываются до того, как клиент получит конец ответа на запрос
+    записи. Ответ GET, начатый в этом процессе до сброса, в кэш не попадает.
+    """
+
+    def __init__(self, app: ASGIApp, storage=None):
+        self.app = app
+        self.storage = storage or MemoryStorage()
+        self._routes: Optional[List[IndexedRoute]] = None
+        # Счетчик сбросов: ответ, начатый до сброса, не записывается в кэш
+        self._drop_generation = 0
+
+    @staticmethod
+    def _query_defaults(route: APIRoute) -> QueryDefaults:
+        defaults = []
+        for field in get_flat_dependant(route.dependant).query_params:
+            default = field.default if not field.required and field.default is not None else ''
+            defaults.append((field.alias, str(default)))
+        return tuple(defaults)
+
+    def _index_routes(self, routes) -> List[IndexedRoute]:
+        indexed = []
+        for route in routes:
+            cache_config, drop_config, query_defaults = None, None, ()
+            if isinstance(route, APIRoute):
+                for dependency in route.dependencies:
+                    if isinstance(dependency.dependency, CacheConfig):
+                        cache_config = dependency.dependency
+                    elif isinstance(dependency.dependency, CacheDropConfig):
+                        drop_config = dependency.dependency
+                if cache_config is not None:
+                    query_defaults = self._query_defaults(route)
+            indexed.append((route, cache_config, drop_config, query_defaults))
+        return indexed
+
+    def _resolve(self, scope: Scope) -> Tuple[Optional[CacheConfig], Optional[CacheDropConfig], QueryDefaults]:
+        if self._routes is None:
+            self._routes = self._index_routes(scope['app'].routes)
+        for route, cache_config, drop_config, query_defaults in self._routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return cache_config, drop_config, query_defaults
+        return None, None, ()
+
+    @staticmethod
+    def _build_key(scope: Scope, query_defaults: QueryDefaults) -> str:
+        """
+        Строит ключ записи из пути и объявленных query-параметров маршрута.
+
+        Параметры берутся в порядке объявления, отсутствующие заменяются
+        значениями по умолчанию, а необъявленные отбрасываются. Поэтому
+        запросы, отличающиеся только порядком параметров или явной передачей
+        значения по умолчанию, попадают в одну запись.
+        """
+        query = QueryParams(scope['query_string'])
+        return scope['path'] + '|' + '|'.join(query.get(name, default) for name, default in query_defaults)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        cache_config, drop_config, query_defaults = self._resolve(scope)
+
+        if cache_config is not None and scope['method'] == 'GET':
+            await self._serve_cached(scope, receive, send, cache_config, query_defaults)
+        elif drop_config is not None:
+            await self._serve_dropping(scope, receive, send, drop_config)
+        else:
+            await self.app(scope, receive, send)
+
+    async def _serve_cached(
+            self, scope: Scope, receive: Receive, send: Send, config: CacheConfig, query_defaults: QueryDefaults
+    ) -> None:
+        key = self._build_key(scope, query_defaults)
+        cached = await self.storage.get(key)
+        if cached is not None:
+            status, headers, body = cached
+            await self._send_response(scope, send, status, headers, body)
+            return
+
+        start: Dict = {}
+        chunks: List[bytes] = []
+        generation = self._drop_generation
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                start.update(message)
+                if message['status'] != 200:
+                    await send(message)
+            elif message['type'] == 'http.response.body' and start.get('status') == 200:
+                # Тело копится до конца ответа: ETag нужно отправить в заголовках
+                chunks.append(message.get('body', b''))
+                if not message.get('more_body', False):
+                    body = b''.join(chunks)
+                    headers = list(start.get('headers', [])) + [(b'etag', self._build_etag(body))]
+                    if generation == self._drop_generation:
+                        await self.storage.set(key, (200, headers, body), config.max_age)
+                    await self._send_response(scope, send, 200, headers, body)
+            else:
+                await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _build_etag(body: bytes) -> bytes:
+        return b'"' + hashlib.blake2b(body, digest_size=16).hexdigest().encode('latin-1') + b'"'
+
+    @staticmethod
+    def _etag_matches(scope: Scope, etag: bytes) -> bool:
+        for name, value in scope['headers']:
+            if name == b'if-none-match':
+                candidates = {candidate.strip().removeprefix(b'W/') for candidate in value.split(b',')}
+                return etag in candidates or b'*' in candidates
+        return False
+
+    async def _send_response(
+            self, scope: Scope, send: Send, status: int, headers: List[Tuple[bytes, bytes]], body: bytes
+    ) -> None:
+        etag = next((value for name, value in headers if name == b'etag'), None)
+        if etag is not None and self._etag_matches(scope, etag):
+            await send({'type': 'http.response.start', 'status': 304, 'headers': [(b'etag', etag)]})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _serve_dropping(self, scope: Scope, receive: Receive, send: Send, config: CacheDropConfig) -> None:
+        status: Dict[str, int] = {}
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            elif (
+                    message['type'] == 'http.response.body'
+                    and not message.get('more_body', False)
+                    and status.get('code', 500) < 400
+            ):
+                # Записи сбрасываются до последнего фрагмента тела: получив
+                # ответ, клиент уже не может прочитать устаревший кэш
+                self._drop_generation += 1
+                await self.storage.drop(config.paths)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -7,7 +7,17 @@ load_dotenv()
 class Settings(BaseSettings):
     app_title: str = 'Сервис анализа патентной активности компаний.'
     cache_ttl: int = 81600
+    cache_redis_url: str = 'redis://localhost:6379/1'
+    export_dir: str = '/tmp/exports'
+    export_workers: int = 2
+    export_result_ttl: int = 86400
+    log_level: str = 'INFO'
     database_url: str
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_query_cache_size: int = 1200
     hawk_project_token: str
 
     #database_cli_url: str
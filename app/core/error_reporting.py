@@ -0,0 +1,71 @@
+"""Отправка ошибок в Hawk в фоне, вне обработки запроса."""
+import asyncio
+import logging
+from typing import Any, Optional
+
+from hawkcatcher import Hawk
+
+logger = logging.getLogger(__name__)
+
+
+class HawkReporter:
+    """
+    Очередь событий для Hawk, разбираемая одной фоновой задачей.
+
+    hawk.send выполняет синхронный HTTPS-запрос, поэтому обработчики ошибок
+    только кладут событие в очередь и сразу возвращают ответ. Фоновая задача
+    отправляет события по одному в отдельном потоке. При переполнении очереди
+    или незапущенной задаче событие отбрасывается с записью в лог.
+
+    Args:
+        token (Optional[str]): Токен проекта Hawk.
+        maxsize (int): Максимальное количество событий в очереди.
+    """
+
+    def __init__(self, token: Optional[str], maxsize: int = 1000):
+        self._hawk: Optional[Hawk] = None
+        try:
+            self._hawk = Hawk(token)
+            logger.info("Hawk initialized successfully")
+        except Exception as e:
+            logger.error("Failed to initialize Hawk: %s", e, exc_info=True)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._hawk is not None and self._worker is None:
+            self._worker = asyncio.create_task(self._drain())
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def report(self, event: Any) -> None:
+        """
+        Ставит событие в очередь на отправку, не дожидаясь сети.
+
+        Args:
+            event (Any): Исключение или данные об ошибке для Hawk.
+        """
+        if self._worker is None:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Hawk queue is full, event dropped")
+
+    async def _drain(self) -> None:
+        while True:
+            event = await self._queue.get()
+            try:
+                await asyncio.to_thread(self._hawk.send, event)
+            except Exception:
+                logger.warning("Failed to send event to Hawk", exc_info=True)
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,69 @@
+"""Метрики Prometheus для времени запросов к базе данных."""
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+DB_QUERY_SECONDS = Histogram(
+    'db_query_seconds',
+    'Время выполнения SQL-запросов в разрезе маршрутов API.',
+    labelnames=['endpoint'],
+)
+
+# Scope текущего HTTP-запроса; маршрут появляется в нем после роутинга
+_current_scope: ContextVar[Optional[Scope]] = ContextVar('current_scope', default=None)
+
+
+def _current_endpoint() -> str:
+    scope = _current_scope.get()
+    if scope is None:
+        return 'none'
+    route = scope.get('route')
+    return route.path if route is not None else 'unmatched'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+    DB_QUERY_SECONDS.labels(endpoint=_current_endpoint()).observe(elapsed)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Подключает к движку замер времени каждого SQL-запроса.
+
+    Args:
+        engine (AsyncEngine): Асинхронный движок SQLAlchemy.
+    """
+    event.listen(engine.sync_engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine.sync_engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+class DBTimeMiddleware:
+    """
+    ASGI-middleware, связывающее SQL-запросы с маршрутом, который их выполнил.
+
+    Сохраняет scope запроса в контекстной переменной. Шаблон пути маршрута
+    (например, /patents/{kind}/{reg_number}) берется из scope при замере,
+    поэтому метка не зависит от значений path-параметров.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
@@ -0,0 +1,38 @@
+"""Классы HTTP-ответов приложения."""
+from typing import Any
+
+from pydantic import TypeAdapter
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+
+class TypeAdapterResponse(Response):
+    """
+    JSON-ответ, сериализуемый заранее скомпилированным TypeAdapter.
+
+    Тело кодируется одним вызовом pydantic-core dump_json без повторной
+    валидации по response_model и промежуточного dict, как у JSONResponse.
+    Адаптер создается один раз при импорте схем и переиспользуется всеми
+    запросами.
+
+    Args:
+        content (Any): Экземпляр схемы ответа.
+        adapter (TypeAdapter): Адаптер схемы ответа.
+        status_code (int): HTTP-статус ответа.
+        background (Optional[BackgroundTask]): Фоновая задача после отправки ответа.
+    """
+
+    media_type = 'application/json'
+
+    def __init__(
+            self,
+            content: Any,
+            adapter: TypeAdapter,
+            status_code: int = 200,
+            background: BackgroundTask | None = None,
+    ) -> None:
+        self.adapter = adapter
+        super().__init__(content, status_code=status_code, background=background)
+
+    def render(self, content: Any) -> bytes:
+        return self.adapter.dump_json(content)
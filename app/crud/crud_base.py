@@ -1,3 +1,4 @@
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi.encoders import jsonable_encoder
@@ -11,6 +12,22 @@ class CRUDBase:
 
     def __init__(self, model):
         self.model = model
+        self._column_keys = tuple(attr.key for attr in inspect(model).column_attrs) if model is not None else ()
+
+    def to_dict(self, db_obj) -> dict:
+        """
+        Возвращает значения колонок объекта модели в виде словаря.
+
+        В отличие от db_obj.__dict__ не содержит служебного _sa_instance_state
+        и связей, поэтому годится для передачи в схемы ответа.
+
+        Args:
+            db_obj: Загруженный объект модели.
+
+        Returns:
+            dict: Словарь {имя атрибута: значение} по колонкам модели.
+        """
+        return {key: getattr(db_obj, key) for key in self._column_keys}
 
     async def get_all_objects(self, session: AsyncSession):
         all_objects = await session.execute(select(self.model))
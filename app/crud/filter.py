@@ -1,4 +1,6 @@
-from typing import Sequence
+import asyncio
+from io import BytesIO
+from typing import List, Sequence
 
 from fastapi import HTTPException
 #import openpyxl
@@ -9,18 +11,24 @@ from app.schemas.filter import FilterCreate
 import pandas as pd
 
 
+def _read_tax_numbers(file: bytes) -> List[str]:
+    """Читает ИНН из первого столбца Excel-файла и дополняет их ведущим нулем."""
+    df = pd.read_excel(BytesIO(file), engine='openpyxl')
+    return df.iloc[:, 0].astype(str).apply(
+        lambda x: '0' + x if len(x) == 9 else '0' + x if len(x) == 11 else x
+    ).tolist()
+
+
 class CRUDFilters:
     def __init__(self):
         self.model = Filter
 
     async def create_filter(self, session: AsyncSession, filter_data: FilterCreate, file: bytes):
         try:
-            async with session.begin():
-                df = pd.read_excel(file, engine='openpyxl')
-                tax_numbers = df.iloc[:, 0].astype(str).apply(
-                    lambda x: '0' + x if len(x) == 9 else '0' + x if len(x) == 11 else x
-                ).tolist()
+            # Разбор Excel синхронный, поэтому выполняется в пуле потоков
+            tax_numbers = await asyncio.to_thread(_read_tax_numbers, file)
 
+            async with session.begin():
                 new_filter = Filter(
                     name=filter_data.name,
                     filename=filter_data.filename,
@@ -1,15 +1,21 @@
 from typing import Dict, Any, Optional
 
-from sqlalchemy import case, select, func
+from sqlalchemy import JSON, Integer, Select, Subquery, case, cast, literal_column, select, func, text, true, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import raiseload
 
 from app.crud.crud_base import CRUDBase
 from app.models import Ownership, Person
 from app.models.filter import FilterTaxNumber
 from app.models.patent import Patent
 
-from app.app_types.responses_types.response import PatentListResponse, PatentHolder, PatentStatsResponse
+from app.app_types.responses_types.response import (
+    KindStatsItem,
+    PatentCursor,
+    PatentListResponse,
+    PatentStatsResponse,
+    StatsItem,
+)
 
 
 class CRUDPatent(CRUDBase):
@@ -20,19 +26,143 @@ class CRUDPatent(CRUDBase):
         model: Модель Patent, с которой работает CRUD.
     """
 
+    # Значения GROUPING(author_count_group, kind) для наборов группировки get_stats
+    _GROUPING_BY_KIND = 2
+    _GROUPING_TOTALS = 3
+
     def __init__(self):
         super().__init__(Patent)
 
+    @staticmethod
+    def _paginate(
+            stmt: Select,
+            page: int,
+            pagesize: int,
+            after_reg_number: Optional[int] = None,
+            after_kind: Optional[int] = None,
+    ) -> Select:
+        """
+        Добавляет к запросу пагинацию.
+
+        Если передан курсор (after_reg_number и after_kind), используется
+        keyset-пагинация по паре (reg_number, kind): выборка начинается сразу
+        после указанного патента и не зависит от глубины страницы. Порядок
+        keyset-страниц свой - по (reg_number, kind), а не по (actual desc, kind,
+        reg_number), как у OFFSET/LIMIT по page.
+
+        Args:
+            stmt: Запрос на получение патентов.
+            page: Номер страницы для пагинации (начиная с 1).
+            pagesize: Количество элементов на странице.
+            after_reg_number: Регистрационный номер последнего патента предыдущей страницы.
+            after_kind: Тип последнего патента предыдущей страницы.
+
+        Returns:
+            Select: Запрос с сортировкой и ограничением выборки.
+        """
+        if after_reg_number is not None:
+            return (
+                stmt
+                .where(tuple_(Patent.reg_number, Patent.kind) > tuple_(after_reg_number, after_kind))
+                .order_by(Patent.reg_number, Patent.kind)
+                .limit(pagesize)
+            )
+        return (
+            stmt
+            .order_by(Patent.actual.desc(), Patent.kind, Patent.reg_number)
+            .offset((page - 1) * pagesize)
+            .limit(pagesize)
+        )
+
+    @staticmethod
+    def _next_cursor(patents_list: list, after_reg_number: Optional[int]) -> Optional[PatentCursor]:
+        """Возвращает ключ последнего патента страницы в режиме keyset-пагинации."""
+        if after_reg_number is None or not patents_list:
+            return None
+        last = patents_list[-1]
+        return PatentCursor(kind=last["kind"], reg_number=last["reg_number"])
+
+    @staticmethod
+    def _list_item(row) -> Dict[str, Any]:
+        """
+        Преобразует строку списка патентов в элемент ответа.
+
+        Списки выбирают колонки таблицы, а не ORM-объекты Patent, поэтому
+        строка уже содержит готовые значения. Владельцы в список не входят:
+        они выбираются только для карточки патента в get_patent.
+        """
+        item = dict(row._mapping)
+        item.pop("total_count", None)
+        return item
+
+    @staticmethod
+    def _count(*criteria):
+        """count(*) с FILTER по условиям; без условий - обычный count(*)."""
+        return func.count().filter(*criteria) if criteria else func.count()
+
+    @staticmethod
+    def _percent(part, total):
+        """Целый процент part от total, вычисляемый в SQL; 0, если total равен нулю."""
+        return func.coalesce(
+            cast(func.round(100.0 * part / func.nullif(total, 0)), Integer),
+            0
+        )
+
+    @staticmethod
+    def _counted_keys(*criteria) -> Subquery:
+        """
+        Возвращает подзапрос с ключами патентов, удовлетворяющих условиям,
+        и колонкой total_count с их общим количеством.
+
+        count(*) OVER () вычисляется в подзапросе до пагинации, поэтому
+        страница и итог приходят одним запросом, а условие курсора и LIMIT
+        внешнего запроса не влияют на итог.
+
+        Args:
+            criteria: Условия отбора патентов.
+
+        Returns:
+            Subquery: Подзапрос с колонками kind, reg_number и total_count.
+        """
+        return (
+            select(Patent.kind, Patent.reg_number, func.count().over().label("total_count"))
+            .where(*criteria)
+            .subquery()
+        )
+
+    @staticmethod
+    async def _get_total_estimate(session: AsyncSession) -> int:
+        """
+        Возвращает количество патентов по статистике планировщика PostgreSQL.
+
+        Оценка pg_class.reltuples читается за микросекунды вместо полного
+        сканирования таблицы patent. Таблица ищется через to_regclass по
+        search_path, а не по relname, который может совпасть с таблицами в
+        других схемах. Если статистика еще не собрана (reltuples = -1 в
+        PostgreSQL 14+), выполняется точный COUNT(*).
+        """
+        estimate = await session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+            {"name": Patent.__tablename__},
+        )
+        total = estimate.scalar()
+        if total is None or total < 0:
+            exact = await session.execute(select(func.count()).select_from(Patent))
+            total = exact.scalar()
+        return total
+
     async def get_patents_list(
             self,
             session: AsyncSession,
             page: int,
             pagesize: int,
             kind: Optional[int] = None,
-            actual: Optional[bool] = None
+            actual: Optional[bool] = None,
+            after_reg_number: Optional[int] = None,
+            after_kind: Optional[int] = None,
     ) -> PatentListResponse:
         """
-        Получает постраничный список патентов с информацией о владельцах.
+        Получает постраничный список патентов без информации о владельцах.
 
         Args:
             session: Асинхронная сессия базы данных.
@@ -40,53 +170,49 @@ class CRUDPatent(CRUDBase):
             pagesize: Количество элементов на странице.
             kind: Опциональный фильтр по типу патента.
             actual: Опциональный фильтр по актуальности патента.
+            after_reg_number: Курсор keyset-пагинации (регистрационный номер).
+            after_kind: Курсор keyset-пагинации (тип патента).
 
         Returns:
             PatentListResponse: Словарь, содержащий:
                 - total: общее количество патентов
-                - items: список патентов с информацией о владельцах
+                - items: список патентов
+                - next_cursor: ключ последнего патента при keyset-пагинации
 
         """
-        skip = (page - 1) * pagesize
-        stmt = (
-            select(Patent)
-            .outerjoin(Ownership,
-                       (Ownership.patent_kind == Patent.kind) & (Ownership.patent_reg_number == Patent.reg_number))
-            .outerjoin(Person, Person.tax_number == Ownership.person_tax_number)
-            .options(selectinload(Patent.ownerships).selectinload(Ownership.person))
-            .group_by(Patent.kind, Patent.reg_number)
-            .order_by(Patent.actual.desc())
-            .offset(skip)
-            .limit(pagesize)
-        )
+        stmt = select(*Patent.__table__.c)
+        criteria = []
         if kind is not None:
-            stmt = stmt.where(Patent.kind == kind)
+            criteria.append(Patent.kind == kind)
         if actual is not None:
-            stmt = stmt.where(Patent.actual == actual)
+            criteria.append(Patent.actual == actual)
+        if criteria:
+            counted = self._counted_keys(*criteria)
+            stmt = (
+                stmt
+                .add_columns(counted.c.total_count)
+                .join(counted, (counted.c.kind == Patent.kind) & (counted.c.reg_number == Patent.reg_number))
+            )
+        stmt = self._paginate(stmt, page, pagesize, after_reg_number, after_kind)
 
         result = await session.execute(stmt)
         patents = result.all()
 
-        patents_list = []
-        for patent in patents:
-            patent_holders = [
-                PatentHolder(
-                    tax_number=ownership.person.tax_number,
-                    full_name=ownership.person.full_name,
-                )
-                for ownership in patent[0].ownerships
-            ]
-            patents_list.append({
-                **patent[0].__dict__,
-                "patent_holders": patent_holders,
-            })
-
-        total = await session.execute(
-            select(func.count()).select_from(Patent))
+        patents_list = [self._list_item(patent) for patent in patents]
+
+        if not criteria:
+            total = await self._get_total_estimate(session)
+        elif patents:
+            total = patents[0].total_count
+        else:
+            # Страница за пределами выборки: строк с итогом нет
+            exact = await session.execute(select(func.count()).select_from(Patent).where(*criteria))
+            total = exact.scalar()
 
         return PatentListResponse(
-            total=total.scalar(),
+            total=total,
             items=patents_list,
+            next_cursor=self._next_cursor(patents_list, after_reg_number),
         )
 
     async def get_patent(
@@ -110,37 +236,41 @@ class CRUDPatent(CRUDBase):
                 - patent_holders: список словарей с информацией о владельцах
 
       """
-        stmt = (
+        # Владельцы одной строкой и списком считаются одним LATERAL-подзапросом
+        # без соединения и группировки по всей строке патента
+        owners = (
             select(
-                Patent,
                 func.string_agg(Person.short_name, ', ').label("owner_raw"),
                 func.coalesce(
-                    func.array_length(func.string_to_array(Patent.author_raw, ', '), 1).label('author_count'),
-                    0
-                )
+                    func.json_agg(
+                        func.json_build_object('tax_number', Person.tax_number, 'full_name', Person.full_name),
+                        type_=JSON,
+                    ),
+                    literal_column("'[]'::json"),
+                    type_=JSON,
+                ).label("holders"),
+            )
+            .select_from(Ownership)
+            .join(Person, Person.tax_number == Ownership.person_tax_number)
+            .where(
+                Ownership.patent_kind == Patent.kind,
+                Ownership.patent_reg_number == Patent.reg_number
             )
-            .outerjoin(Ownership,
-                       (Ownership.patent_kind == Patent.kind) & (Ownership.patent_reg_number == Patent.reg_number))
-            .outerjoin(Person, Person.tax_number == Ownership.person_tax_number)
-            .options(selectinload(Patent.ownerships).selectinload(Ownership.person))
-            .group_by(Patent.kind, Patent.reg_number)
+            .lateral("owners")
+        )
+        stmt = (
+            select(Patent, owners.c.owner_raw, owners.c.holders)
+            .join(owners, true())
+            .options(raiseload('*'))
             .where((Patent.kind == patent_kind) & (Patent.reg_number == patent_reg_number))
         )
         result = await session.execute(stmt)
-        patent, owner_raw, author_count = result.one()
-
-        patent_holders = [
-            PatentHolder(
-                tax_number=ownership.person.tax_number,
-                full_name=ownership.person.full_name,
-            )
-            for ownership in patent.ownerships
-        ]
+        patent, owner_raw, holders = result.one()
 
         return {
-            **patent.__dict__,
+            **self.to_dict(patent),
             "owner_raw": owner_raw,
-            "patent_holders": patent_holders,
+            "patent_holders": holders,
         }
 
     async def get_stats(
@@ -163,132 +293,71 @@ class CRUDPatent(CRUDBase):
                 - total_ru_with_holders: количество российских патентов с указанными владельцами
                 - with_holders_percent: процент патентов с указанными владельцами
                 - ru_with_holders_percent: процент российских патентов с указанными владельцами
-                - by_author_count: распределение по количеству авторов
-                - by_patent_kind: распределение по типам патентов
+                - by_author_count: распределение по количеству авторов, список {name, count}
+                - by_patent_kind: распределение по типам патентов, список {kind, count}
         """
-        stats: Dict[str, Any] = {}
-
-        total_patents_stmt = (
-            select(func.count()).select_from(Patent)
-        )
-        if filter_id is not None:
-            total_patents_stmt = (
-                total_patents_stmt
-                .join(Ownership)
-                .join(
-                    FilterTaxNumber,
-                    Ownership.person_tax_number == FilterTaxNumber.tax_number
-                )
-                .filter_by(filter_id=filter_id)
-            )
-        total_patents_res = await session.execute(total_patents_stmt)
-        stats["total_patents"] = total_patents_res.scalar()
-
-        total_patents_ru_stmt = (
-            select(func.count()).select_from(Patent).filter_by(country_code="RU")
-        )
-        if filter_id is not None:
-            total_patents_ru_stmt = (
-                total_patents_ru_stmt
-                .join(Ownership)
-                .join(
-                    FilterTaxNumber,
-                    Ownership.person_tax_number == FilterTaxNumber.tax_number
-                )
-                .filter_by(filter_id=filter_id)
-            )
-        total_patents_ru_res = await session.execute(total_patents_ru_stmt)
-        stats["total_ru_patents"] = total_patents_ru_res.scalar()
-
-        total_with_holders_stmt = (
-            select(func.count(func.distinct(Patent.kind, Patent.reg_number)))
-            .select_from(Patent)
-            .join(Ownership)
+        stats: Dict[str, Any] = {"by_author_count": [], "by_patent_kind": []}
+        is_ru = Patent.country_code == "RU"
+
+        # Полусоединение с Ownership вместо COUNT(DISTINCT) по результату JOIN:
+        # каждый патент считается один раз, внешний запрос идет по таблице Patent
+        holders = select(Ownership.patent_kind).where(
+            Ownership.patent_kind == Patent.kind,
+            Ownership.patent_reg_number == Patent.reg_number
         )
         if filter_id is not None:
-            total_with_holders_stmt = (
-                total_with_holders_stmt
-                .join(
-                    FilterTaxNumber,
-                    Ownership.person_tax_number == FilterTaxNumber.tax_number
-                )
-                .filter_by(filter_id=filter_id)
-            )
-        total_with_holders_res = await session.execute(total_with_holders_stmt)
-        stats["total_with_holders"] = total_with_holders_res.scalar()
-
-        total_ru_with_holders_stmt = (
-            select(func.count(func.distinct(Patent.kind, Patent.reg_number)))
-            .select_from(Patent)
-            .filter_by(country_code="RU")
-            .join(Ownership)
+            holders = holders.join(
+                FilterTaxNumber,
+                Ownership.person_tax_number == FilterTaxNumber.tax_number
+            ).where(FilterTaxNumber.filter_id == filter_id)
+        has_holders = holders.exists()
+        # С фильтром условие has_holders уже стоит в WHERE и каждая строка
+        # выборки имеет владельцев: повторять EXISTS в FILTER не нужно
+        holder_criteria = () if filter_id is not None else (has_holders,)
+
+        author_count_group = case(
+            (Patent.author_count == 0, "0"),
+            (Patent.author_count == 1, "1"),
+            (Patent.author_count <= 5, "2–5"),
+            else_="5+"
         )
-        if filter_id is not None:
-            total_ru_with_holders_stmt = (
-                total_ru_with_holders_stmt
-                .join(
-                    FilterTaxNumber,
-                    Ownership.person_tax_number == FilterTaxNumber.tax_number
-                )
-                .filter_by(filter_id=filter_id)
-            )
-        total_ru_with_holders_res = await session.execute(total_ru_with_holders_stmt)
-        stats["total_ru_with_holders"] = total_ru_with_holders_res.scalar()
-
-        stats["with_holders_percent"] = int(round(
-            100 * stats["total_with_holders"] / stats["total_patents"]))
-        stats["ru_with_holders_percent"] = int(round(
-            100 * stats["total_ru_with_holders"] / stats["total_ru_patents"]))
-
-        by_author_count_stmt = (
+        # Итоги (пустой набор группировки) и оба распределения считаются
+        # одним запросом за один проход по таблице
+        stmt = (
             select(
-                case(
-                    (Patent.author_count == 0, "0"),
-                    (Patent.author_count == 1, "1"),
-                    (Patent.author_count <= 5, "2–5"),
-                    else_="5+"
-                ).label("author_count_group"),
-                func.count()
+                func.grouping(author_count_group, Patent.kind).label("grouping"),
+                author_count_group.label("author_count_group"),
+                Patent.kind,
+                func.count().label("total_patents"),
+                func.count().filter(is_ru).label("total_ru_patents"),
+                self._count(*holder_criteria).label("total_with_holders"),
+                self._count(is_ru, *holder_criteria).label("total_ru_with_holders"),
+                self._percent(self._count(*holder_criteria), func.count()).label("with_holders_percent"),
+                self._percent(
+                    self._count(is_ru, *holder_criteria), func.count().filter(is_ru)
+                ).label("ru_with_holders_percent"),
             )
             .select_from(Patent)
-            .group_by("author_count_group")
+            .group_by(func.grouping_sets(tuple_(author_count_group), tuple_(Patent.kind), tuple_()))
+            # Распределения приходят уже отсортированными по группе
+            .order_by(author_count_group, Patent.kind)
         )
         if filter_id is not None:
-            by_author_count_stmt = (
-                by_author_count_stmt
-                .join(Ownership)
-                .join(
-                    FilterTaxNumber,
-                    Ownership.person_tax_number == FilterTaxNumber.tax_number
-                )
-                .filter_by(filter_id=filter_id)
-            )
-        by_author_count_res = await session.execute(by_author_count_stmt)
-        stats["by_author_count"] = {
-            row[0]: row[1]
-            for row in by_author_count_res.all()
-        }
+            stmt = stmt.where(has_holders)
 
-        by_patent_kind_stmt = (
-            select(Patent.kind, func.count())
-            .select_from(Patent)
-            .group_by(Patent.kind)
-        )
-        if filter_id is not None:
-            by_patent_kind_stmt = (
-                by_patent_kind_stmt
-                .join(Ownership)
-                .join(
-                    FilterTaxNumber,
-                    Ownership.person_tax_number == FilterTaxNumber.tax_number
-                )
-                .filter_by(filter_id=filter_id)
-            )
-        by_patent_kind_res = await session.execute(by_patent_kind_stmt)
-        stats["by_patent_kind"] = {
-            res[0]: res[1]
-            for res in by_patent_kind_res.all()
-        }
+        result = await session.execute(stmt)
+        for row in result.all():
+            if row.grouping == self._GROUPING_TOTALS:
+                stats["total_patents"] = row.total_patents
+                stats["total_ru_patents"] = row.total_ru_patents
+                stats["total_with_holders"] = row.total_with_holders
+                stats["total_ru_with_holders"] = row.total_ru_with_holders
+                stats["with_holders_percent"] = row.with_holders_percent
+                stats["ru_with_holders_percent"] = row.ru_with_holders_percent
+            elif row.grouping == self._GROUPING_BY_KIND:
+                stats["by_patent_kind"].append(KindStatsItem(kind=row.kind, count=row.total_patents))
+            else:
+                stats["by_author_count"].append(StatsItem(name=row.author_count_group, count=row.total_patents))
 
         return PatentStatsResponse(**stats)
 
@@ -297,7 +366,9 @@ class CRUDPatent(CRUDBase):
             session: AsyncSession,
             page: int,
             pagesize: int,
-            filter_id: int
+            filter_id: int,
+            after_reg_number: Optional[int] = None,
+            after_kind: Optional[int] = None,
     ) -> PatentListResponse:
         """
         Получает постраничный список патентов, отфильтрованный по списку ИНН владельцев.
@@ -307,61 +378,52 @@ class CRUDPatent(CRUDBase):
             page: Номер страницы для пагинации (начиная с 1).
             pagesize: Количество элементов на странице.
             filter_id: Идентификатор фильтра со списком ИНН.
+            after_reg_number: Курсор keyset-пагинации (регистрационный номер).
+            after_kind: Курсор keyset-пагинации (тип патента).
 
         Returns:
             PatentListResponse: Словарь, содержащий:
                 - total: общее количество патентов, соответствующих фильтру
-                - items: список отфильтрованных патентов с информацией о владельцах
+                - items: список отфильтрованных патентов
+                - next_cursor: ключ последнего патента при keyset-пагинации
 
         """
-        skip = (page - 1) * pagesize
-
-        # Получаем список ИНН из фильтра
-        tax_numbers_stmt = select(FilterTaxNumber.tax_number).where(FilterTaxNumber.filter_id == filter_id)
-        tax_numbers_result = await session.execute(tax_numbers_stmt)
-        tax_numbers = [row[0] for row in tax_numbers_result.all()]
+        # Список ИНН фильтра остается на стороне базы
+        tax_numbers = select(FilterTaxNumber.tax_number).where(FilterTaxNumber.filter_id == filter_id)
+
+        owned_by_filter = (
+            select(Ownership.patent_kind)
+            .where(
+                Ownership.patent_kind == Patent.kind,
+                Ownership.patent_reg_number == Patent.reg_number,
+                Ownership.person_tax_number.in_(tax_numbers)
+            )
+            .exists()
+        )
 
         # Формируем запрос на получение патентов
+        counted = self._counted_keys(owned_by_filter)
         stmt = (
-            select(Patent)
-            .outerjoin(Ownership,
-                       (Ownership.patent_kind == Patent.kind) & (Ownership.patent_reg_number == Patent.reg_number))
-            .outerjoin(Person, Person.tax_number == Ownership.person_tax_number)
-            .where(Person.tax_number.in_(tax_numbers))
-            .options(selectinload(Patent.ownerships).selectinload(Ownership.person))
-            .group_by(Patent.kind, Patent.reg_number)
-            .offset(skip)
-            .limit(pagesize)
+            select(*Patent.__table__.c, counted.c.total_count)
+            .join(counted, (counted.c.kind == Patent.kind) & (counted.c.reg_number == Patent.reg_number))
         )
+        stmt = self._paginate(stmt, page, pagesize, after_reg_number, after_kind)
 
         result = await session.execute(stmt)
         patents = result.all()
 
-        patents_list = []
-        for patent in patents:
-            patent_holders = [
-                PatentHolder(
-                    tax_number=ownership.person.tax_number,
-                    full_name=ownership.person.full_name,
-                )
-                for ownership in patent[0].ownerships
-            ]
-
-            patents_list.append({
-                **patent[0].__dict__,
-                "patent_holders": patent_holders,
-            })
-
-        total = await session.execute(
-            select(func.count())
-            .select_from(Patent)
-            .outerjoin(Ownership)
-            .where(Ownership.person_tax_number.in_(tax_numbers)))
+        patents_list = [self._list_item(patent) for patent in patents]
+
+        if patents:
+            total = patents[0].total_count
+        else:
+            exact = await session.execute(select(func.count()).select_from(Patent).where(owned_by_filter))
+            total = exact.scalar()
 
         return PatentListResponse(
-            total=total.scalar(),
+            total=total,
             items=patents_list,
+            next_cursor=self._next_cursor(patents_list, after_reg_number),
         )
 
-
 patent_crud = CRUDPatent()
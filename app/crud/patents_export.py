@@ -1,51 +1,58 @@
 import asyncio
-from io import BytesIO
-from tempfile import NamedTemporaryFile
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional
-
-import aiofiles
+from uuid import uuid4
 
 from fastapi import HTTPException
 from openpyxl.workbook import Workbook
 
-from sqlalchemy import select, func, case, literal_column, and_
+from sqlalchemy import Select, select, func, case, literal_column, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fastapi.responses import StreamingResponse
-
 from app.celery_worker import celery_app
+from app.core.config import settings
 from app.core.db import AsyncSessionLocal, engine
 import logging
 from app.models import Patent, Person, Ownership
 from app.models.filter import FilterTaxNumber
 
 logger = logging.getLogger(__name__)
-async def get_export_patent_file(
-        session: AsyncSession,
+
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Количество строк, забираемых из серверного курсора за одну итерацию.
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_HEADERS = [
+    "ИНН", "Вид", "Категория", "Полное наименование", "Регистрационный номер патента",
+    "Вид патента", "Дата регистрации", "Название", "Актуальность патента",
+    "Индекс класса по МПК", "Индекс подкласса по МПК", "Регион правообладателя",
+    "Город правообладателя", "Число авторов"
+]
+
+
+def get_export_statement(
         filter_id: Optional[int] = None,
         actual: Optional[str] = None,
         kind: Optional[int] = None,
-
-):
+) -> Select:
     """
-    Получает данные о патентах и экспортирует их в файл XLSX.
+    Формирует запрос на выгрузку патентов с учетом фильтров.
 
     Args:
-        session (AsyncSession): Сессия для взаимодействия с базой данных.
-
-        filter_id (Optional[int], optional): Идентификатор фильтра. Если указан, будут экспортированы только
-            патенты, связанные с этим фильтром. Если не указан, будут экспортированы первые 10000 патентов.
+        filter_id (Optional[int], optional): Идентификатор фильтра по списку ИНН.
+        actual (Optional[str], optional): "Актуально" или "Неактуально".
+        kind (Optional[int], optional): Вид патента.
 
-        actual (Optional[str], optional): Фильтр по актуальности патента. Если "Актуально", будут экспортированы
-            только актуальные патенты. Если "Неактуально", будут экспортированы только неактуальные патенты.
-            Если не указан, актуальность не будет учитываться.
-
-        kind (Optional[int], optional): Фильтр по виду патента. Если указан, будут экспортированы только патенты
-            указанного вида (1 - изобретение, 2 - полезная модель, 3 - промышленный образец).
+    Raises:
+        HTTPException: Если передано некорректное значение параметра actual.
 
     Returns:
-        StreamingResponse: Поток данных с XLSX-файлом, содержащим информацию о патентах.
-        """
+        Select: Запрос на получение строк выгрузки.
+    """
     author_count_subquery = (
         select(
             Patent.reg_number.label('patent_reg_number'),
@@ -87,7 +94,6 @@ async def get_export_patent_file(
             author_count_subquery.c.patent_kind == Patent.kind
         ))
         .order_by(Patent.reg_number)
-        .limit(10000)
     )
 
     if filter_id:
@@ -109,47 +115,150 @@ async def get_export_patent_file(
     if kind:
         stmt = stmt.where(Patent.kind == kind)
 
-    headers = [
-        "ИНН", "Вид", "Категория", "Полное наименование", "Регистрационный номер патента",
-        "Вид патента", "Дата регистрации", "Название", "Актуальность патента",
-        "Индекс класса по МПК", "Индекс подкласса по МПК", "Регион правообладателя",
-        "Город правообладателя", "Число авторов"
+    return stmt
+
+
+def _export_row(row) -> list:
+    """Преобразует строку результата запроса в строку листа выгрузки."""
+    return [
+        row.tax_number,
+        row.person_kind,
+        row.person_category,
+        row.full_name,
+        row.reg_number,
+        row.patent_kind,
+        row.reg_date,
+        row.name,
+        row.actual,
+        row.subcategory,
+        row.region,
+        row.city,
+        row.author_count
     ]
 
-    with NamedTemporaryFile(delete=False) as temp_file:
-        wb = Workbook(write_only=True)
-        ws = wb.create_sheet(title="Patents")
-        ws.append(headers)
-
-        result = await session.execute(stmt)
-        for row in result:
-            row_data = [
-                row.tax_number,
-                row.person_kind,
-                row.person_category,
-                row.full_name,
-                row.reg_number,
-                row.patent_kind,
-                row.reg_date,
-                row.name,
-                row.actual,
-                row.subcategory,
-                row.region,
-                row.city,
-                row.author_count
-            ]
-            ws.append(row_data)
-
-        wb.save(temp_file.name)
-
-        async with aiofiles.open(temp_file.name, mode="rb") as f:
-            content = await f.read()
-
-    return StreamingResponse(
-        BytesIO(content),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        headers={"Content-Disposition": "attachment; filename=patents_export.xlsx"}
-    )
+
+_export_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_export_executor() -> ProcessPoolExecutor:
+    """
+    Возвращает пул процессов для сборки XLSX, создавая его при первом вызове.
+
+    openpyxl написан на чистом Python, поэтому сборка книги в потоке держала бы
+    GIL и останавливала цикл событий. Дочерние процессы запускаются через spawn:
+    fork процесса с работающими потоками может унаследовать захваченные блокировки.
+    Размер пула задается settings.export_workers: пул создается в каждом воркере
+    uvicorn, поэтому он небольшой и не зависит от числа ядер.
+    """
+    global _export_executor
+    if _export_executor is None:
+        _export_executor = ProcessPoolExecutor(
+            max_workers=settings.export_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _export_executor
+
+
+def shutdown_export_executor() -> None:
+    """
+    Останавливает пул процессов выгрузки, если он был создан.
+
+    Вызывается из lifespan приложения, поэтому не ждет завершения выгрузок,
+    которые уже выполняются: иначе цикл событий был бы заблокирован до их
+    окончания. Задачи из очереди пула отменяются.
+    """
+    global _export_executor
+    if _export_executor is not None:
+        _export_executor.shutdown(wait=False, cancel_futures=True)
+        _export_executor = None
+
+
+async def write_export_rows(session: AsyncSession, stmt: Select, ws) -> None:
+    """
+    Пишет строки выгрузки на лист по мере чтения из серверного курсора.
+
+    Из курсора забирается по EXPORT_BATCH_SIZE строк, и каждая пачка сразу
+    уходит на лист write_only, который сбрасывает строки во временный файл.
+    В памяти одновременно находится не больше одной пачки.
+
+    Args:
+        session (AsyncSession): Сессия для взаимодействия с базой данных.
+        stmt (Select): Запрос, сформированный get_export_statement.
+        ws: Лист книги openpyxl в режиме write_only.
+    """
+    result = await session.stream(stmt)
+    async for partition in result.partitions(EXPORT_BATCH_SIZE):
+        for row in partition:
+            ws.append(_export_row(row))
+
+
+async def _stream_export_file(
+        filter_id: Optional[int],
+        actual: Optional[str],
+        kind: Optional[int],
+        path: str,
+) -> None:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title="Patents")
+    ws.append(EXPORT_HEADERS)
+    try:
+        async with AsyncSessionLocal() as session:
+            await write_export_rows(session, get_export_statement(filter_id, actual, kind), ws)
+    finally:
+        # Соединения пула привязаны к циклу событий, который будет закрыт
+        await engine.dispose()
+    wb.save(path)
+
+
+def build_export_file(
+        filter_id: Optional[int],
+        actual: Optional[str],
+        kind: Optional[int],
+        path: str,
+) -> None:
+    """
+    Читает строки выгрузки из базы и сохраняет XLSX-книгу на диск.
+
+    Функция синхронная и сама открывает соединение с базой в собственном цикле
+    событий, поэтому выполняется в дочернем процессе пула или в воркере Celery.
+    Между процессами передаются только параметры фильтров и путь к файлу.
+
+    Args:
+        filter_id (Optional[int]): Идентификатор фильтра по списку ИНН.
+        actual (Optional[str]): "Актуально" или "Неактуально".
+        kind (Optional[int]): Вид патента.
+        path (str): Путь, в который сохраняется книга.
+    """
+    asyncio.run(_stream_export_file(filter_id, actual, kind, path))
+
+
+async def create_export_patent_file(
+        filter_id: Optional[int] = None,
+        actual: Optional[str] = None,
+        kind: Optional[int] = None,
+) -> str:
+    """
+    Создает XLSX-файл выгрузки в каталоге settings.export_dir.
+
+    Чтение строк и сборка книги выполняются в пуле процессов, цикл событий
+    приложения только ожидает результат. Удаление файла остается за
+    вызывающим кодом.
+
+    Args:
+        filter_id (Optional[int]): Идентификатор фильтра по списку ИНН.
+        actual (Optional[str]): "Актуально" или "Неактуально".
+        kind (Optional[int]): Вид патента.
+
+    Returns:
+        str: Путь к созданному файлу.
+    """
+    os.makedirs(settings.export_dir, exist_ok=True)
+    path = os.path.join(settings.export_dir, f"{uuid4()}.xlsx")
+
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(get_export_executor(), build_export_file, filter_id, actual, kind, path)
+    return path
+
 
 @celery_app.task(bind=True, max_retries=2, default_retry_delay=5)
 def export_patents_task(
@@ -160,28 +269,60 @@ def export_patents_task(
 ):
     """
     Celery-задача для асинхронного вызова функции экспорта патентов.
+
+    Файл сохраняется в каталог settings.export_dir, результатом задачи является
+    путь к нему: через Redis передается короткая строка, а не содержимое XLSX.
     """
     try:
         logger.info("Starting export_patents_task with filter_id=%s, actual=%s, kind=%s", filter_id, actual, kind)
 
-        # Создаем асинхронный код в отдельной функции
-        async def run_export_task():
-            async with AsyncSessionLocal() as session:
-                response =  await get_export_patent_file(session, filter_id, actual, kind)
-                print(response)
-                return response.body()
+        os.makedirs(settings.export_dir, exist_ok=True)
+        path = os.path.join(settings.export_dir, f"{uuid4()}.xlsx")
 
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(run_export_task())
-        loop.close()
+        build_export_file(filter_id, actual, kind, path)
 
         logger.info("Task completed successfully")
-        return result
+        return path
 
     except Exception as e:
         logger.error("Error in export_patents_task: %s", str(e))
         raise self.retry(exc=e)
 
 
+@celery_app.task
+def cleanup_export_files(max_age: Optional[int] = None) -> int:
+    """
+    Удаляет из settings.export_dir файлы выгрузки старше max_age секунд.
+
+    Файл удаляется после отправки клиенту, но если результат так и не
+    запросили, он остается на диске. После истечения результата задачи
+    (settings.export_result_ttl) путь к файлу уже не получить, поэтому такие
+    файлы можно удалять.
+
+    Args:
+        max_age (Optional[int]): Возраст файла по mtime в секундах,
+            по умолчанию settings.export_result_ttl.
+
+    Returns:
+        int: Количество удаленных файлов.
+    """
+    if max_age is None:
+        max_age = settings.export_result_ttl
+    if not os.path.isdir(settings.export_dir):
+        return 0
 
+    deadline = time.time() - max_age
+    removed = 0
+    with os.scandir(settings.export_dir) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.xlsx') or not entry.is_file():
+                continue
+            try:
+                if entry.stat().st_mtime < deadline:
+                    os.unlink(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                # Файл успели отдать и удалить параллельно
+                continue
+    logger.info("Removed %s stale export files", removed)
+    return removed
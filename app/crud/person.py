@@ -1,8 +1,9 @@
-from typing import Any, Dict, Optional
+import asyncio
+from typing import Any, Optional
 
-from sqlalchemy import select, func, and_, case
+from sqlalchemy import BigInteger, Select, cast, func, literal, select, tuple_, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import raiseload, selectinload
 
 from app.app_types.responses_types.response import FromPersonPatentStatsResponse
 from app.crud.crud_base import CRUDBase
@@ -12,9 +13,84 @@ from app.models.person import Person
 
 
 class CRUDPerson(CRUDBase):
+    # Значения GROUPING(kind, category) для наборов группировки статистики
+    _GROUPING_BY_KIND = 1
+    _GROUPING_BY_CATEGORY = 2
+
     def __init__(self):
         super().__init__(Person)
 
+    @staticmethod
+    def _join_filter(stmt: Select, filter_id: Optional[int]) -> Select:
+        """Ограничивает запрос по персонам списком ИНН фильтра, если он задан."""
+        if filter_id is None:
+            return stmt
+        return (
+            stmt
+            .join(FilterTaxNumber, Person.tax_number == FilterTaxNumber.tax_number)
+            .where(FilterTaxNumber.filter_id == filter_id)
+        )
+
+    def _collect_grouped_stats(self, rows) -> dict:
+        """
+        Раскладывает строки запроса с GROUPING SETS ((kind), (category), ())
+        на итоговую строку и распределения по виду и категории.
+        """
+        stats = {"totals": None, "by_kind": {}, "by_category": {}}
+        for row in rows:
+            if row.grouping == self._GROUPING_BY_KIND:
+                stats["by_kind"][row.kind] = row.count
+            elif row.grouping == self._GROUPING_BY_CATEGORY:
+                stats["by_category"][row.category] = row.count
+            else:
+                stats["totals"] = row
+        return stats
+
+    @staticmethod
+    def _top_and_others(grouped: Select, top: int = 5) -> Select:
+        """
+        Строит запрос, возвращающий первые top групп по убыванию количества
+        и строку "Остальные" с суммой по прочим группам.
+
+        Ранжирование и суммирование выполняются в PostgreSQL, поэтому клиенту
+        приходит не больше top + 1 строк при любом числе групп. Строка
+        "Остальные" отсутствует, если прочих групп нет.
+
+        Args:
+            grouped (Select): Запрос с колонками (название, количество), сгруппированный по названию.
+            top (int): Количество групп в топе.
+
+        Returns:
+            Select: Запрос с колонками name и count в порядке вывода.
+        """
+        agg = grouped.cte("agg")
+        name, count = agg.c
+        ranked = select(
+            name.label("name"),
+            count.label("count"),
+            func.row_number().over(order_by=count.desc()).label("rn"),
+        ).cte("ranked")
+
+        top_stmt = select(ranked.c.name, ranked.c.count, ranked.c.rn).where(ranked.c.rn <= top)
+        others_stmt = (
+            select(
+                literal("Остальные").label("name"),
+                cast(func.sum(ranked.c.count), BigInteger).label("count"),
+                literal(top + 1).label("rn"),
+            )
+            .where(ranked.c.rn > top)
+            .having(func.sum(ranked.c.count) > 0)
+        )
+        stmt = union_all(top_stmt, others_stmt).subquery()
+        return select(stmt.c.name, stmt.c.count).order_by(stmt.c.rn)
+
+    @staticmethod
+    def _percentage(part: int, total: int) -> float:
+        """Доля part от total в процентах с округлением до сотых; 0, если total пуст."""
+        if not part or not total:
+            return 0
+        return round(part / total * 100, 2)
+
     async def get_patents_stats(self, session: AsyncSession) -> FromPersonPatentStatsResponse:
         """
         Получает статистику по патентам:
@@ -29,35 +105,28 @@ class CRUDPerson(CRUDBase):
             Dict[str, List[Dict[str, Any]]]: Статистика по трем категориям
         """
 
-        async def get_top_5_and_others(query) -> list[dict[str, Any]]:
-            """Вспомогательная функция для получения топ-5 и суммы остальных"""
-            result = await session.execute(query)
-
-            all_data = result.all()
-
-            if not all_data:
-                return []
-
-            top_5 = all_data[:5]
-
-            others_sum = sum(count for _, count in all_data[5:])
+        async def get_top_5_and_others(query, query_session: AsyncSession) -> list[dict[str, Any]]:
+            """
+            Вспомогательная функция для получения топ-5 и суммы остальных.
+            """
+            result = await query_session.execute(self._top_and_others(query))
+            return [{"name": name, "count": count} for name, count in result.all()]
 
-            result_list = [
-                {"name": name, "count": count}
-                for name, count in top_5
-            ]
-
-            if others_sum > 0:
-                result_list.append({"name": "Остальные", "count": others_sum})
-
-            return result_list
+        async def get_on_own_session(query) -> list[dict[str, Any]]:
+            """
+            Выполняет запрос в отдельной сессии на движке переданной сессии.
 
+            Запросы независимы и выполняются параллельно, а одна сессия не
+            допускает параллельных запросов, поэтому второму и третьему
+            нужны собственные соединения.
+            """
+            async with AsyncSession(session.bind, expire_on_commit=False) as own_session:
+                return await get_top_5_and_others(query, own_session)
 
         okopf_stmt = (
             select(Person.okopf, func.count(Ownership.patent_reg_number).label('patent_count'))
             .join(Ownership, Person.tax_number == Ownership.person_tax_number)
             .group_by(Person.okopf)
-            .order_by(func.count(Ownership.patent_reg_number).desc())
         )
 
 
@@ -65,7 +134,6 @@ class CRUDPerson(CRUDBase):
             select(Person.okvad, func.count(Ownership.patent_reg_number).label('patent_count'))
             .join(Ownership, Person.tax_number == Ownership.person_tax_number)
             .group_by(Person.okvad)
-            .order_by(func.count(Ownership.patent_reg_number).desc())
         )
 
         # Запрос по МПК (subcategory)
@@ -76,14 +144,18 @@ class CRUDPerson(CRUDBase):
                   (Patent.reg_number == Ownership.patent_reg_number))
             .filter(Patent.kind.in_([1, 2]))
             .group_by(Patent.subcategory)
-            .order_by(func.count(Patent.reg_number).desc())
         )
 
 
+        okopf_stats, okvad_stats, mpk_stats = await asyncio.gather(
+            get_top_5_and_others(okopf_stmt, session),
+            get_on_own_session(okvad_stmt),
+            get_on_own_session(mpk_stmt),
+        )
         stats = {
-            "okopf_stats": await get_top_5_and_others(okopf_stmt),
-            "okvad_stats": await get_top_5_and_others(okvad_stmt),
-            "mpk_stats": await get_top_5_and_others(mpk_stmt)
+            "okopf_stats": okopf_stats,
+            "okvad_stats": okvad_stats,
+            "mpk_stats": mpk_stats
         }
 
         return FromPersonPatentStatsResponse(**stats)
@@ -101,65 +173,25 @@ class CRUDPerson(CRUDBase):
         Returns:
             dict: словарь со статистикой.
         """
-        stats = {}
-
-        total_persons_stmt = (
-            select(func.count()).select_from(Person)
-        )
-        if filter_id is not None:
-            total_persons_stmt = (
-                total_persons_stmt
-                .join(
-                    FilterTaxNumber,
-                    Person.tax_number == FilterTaxNumber.tax_number
-                )
-                .filter_by(filter_id=filter_id)
+        stmt = (
+            select(
+                func.grouping(Person.kind, Person.category).label("grouping"),
+                Person.kind,
+                Person.category,
+                func.count().label("count"),
             )
-        total_persons_res = await session.execute(total_persons_stmt)
-        stats["total_persons"] = total_persons_res.scalar()
-
-        by_kind_stmt = (
-            select(Person.kind, func.count())
-            .select_from(Person)
-            .group_by(Person.kind)
+            .group_by(func.grouping_sets(tuple_(Person.kind), tuple_(Person.category), tuple_()))
         )
-        if filter_id is not None:
-            by_kind_stmt = (
-                by_kind_stmt
-                .join(
-                    FilterTaxNumber,
-                    Person.tax_number == FilterTaxNumber.tax_number
-                )
-                .filter_by(filter_id=filter_id)
-            )
-        by_kind_res = await session.execute(by_kind_stmt)
-        stats["by_kind"] = {
-            res[0]: res[1]
-            for res in by_kind_res.all()
-        }
+        stmt = self._join_filter(stmt, filter_id)
 
-        by_category_stmt = (
-            select(Person.category, func.count())
-            .select_from(Person)
-            .group_by(Person.category)
-        )
-        if filter_id is not None:
-            by_category_stmt = (
-                by_category_stmt
-                .join(
-                    FilterTaxNumber,
-                    Person.tax_number == FilterTaxNumber.tax_number
-                )
-                .filter_by(filter_id=filter_id)
-            )
-        by_category_res = await session.execute(by_category_stmt)
-        stats["by_category"] = {
-            res[0]: res[1]
-            for res in by_category_res.all()
+        result = await session.execute(stmt)
+        stats = self._collect_grouped_stats(result.all())
+        return {
+            "total_persons": stats["totals"].count,
+            "by_kind": stats["by_kind"],
+            "by_category": stats["by_category"],
         }
 
-        return stats
-
     async def get_msk_stats(
         self, session: AsyncSession, filter_id: Optional[int] = None
     ) -> dict:
@@ -173,114 +205,31 @@ class CRUDPerson(CRUDBase):
         Returns:
             dict: словарь со статистикой.
         """
-        stats = {}
-
-        total_persons_msk_stmt = (
-            select(func.count()).filter(Person.region.ilike('%москва%'))
-        )
-        if filter_id is not None:
-            total_persons_msk_stmt = (
-                total_persons_msk_stmt
-                .join(
-                    FilterTaxNumber,
-                    Person.tax_number == FilterTaxNumber.tax_number
-                )
-                .filter_by(filter_id=filter_id)
-            )
-        total_persons_res = await session.execute(total_persons_msk_stmt)
-        stats["total_persons"] = total_persons_res.scalar()
-
-        by_kind_msk_stmt = (
-            select(Person.kind, func.count().label("count"))
-            .select_from(Person).filter(Person.region.ilike('%москва%'))
-            .group_by(Person.kind)
-        )
-        if filter_id is not None:
-            by_kind_msk_stmt = (
-                by_kind_msk_stmt
-                .join(
-                    FilterTaxNumber,
-                    Person.tax_number == FilterTaxNumber.tax_number
-                )
-                .filter_by(filter_id=filter_id)
-            )
-        by_kind_res = await session.execute(by_kind_msk_stmt)
-        stats["by_kind"] = {
-            res[0]: res[1]
-            for res in by_kind_res.all()
-        }
-
-        by_category_msk_stmt = (
-            select(Person.category, func.count())
-            .select_from(Person).filter(Person.region.ilike('%москва%'))
-            .group_by(Person.category)
-        )
-        if filter_id is not None:
-            by_category_msk_stmt = (
-                by_category_msk_stmt
-                .join(
-                    FilterTaxNumber,
-                    Person.tax_number == FilterTaxNumber.tax_number
-                )
-                .filter_by(filter_id=filter_id)
-            )
-        by_category_res = await session.execute(by_category_msk_stmt)
-        stats["by_category"] = {
-            res[0]: res[1]
-            for res in by_category_res.all()
-        }
-
-        by_percent_msk_cluster_stmt = (
+        stmt = (
             select(
+                func.grouping(Person.kind, Person.category).label("grouping"),
+                Person.kind,
+                Person.category,
+                func.count().label("count"),
                 func.count().filter(Person.uk == 1).label("cluster_count"),
-                func.count().label("total_count")
+                func.count().filter(Person.support_type.isnot(None)).label("support_type_count"),
             )
-            .select_from(Person)
-            .filter(Person.region.ilike('%москва%'))
-
+            .where(Person.is_moscow)
+            .group_by(func.grouping_sets(tuple_(Person.kind), tuple_(Person.category), tuple_()))
         )
+        stmt = self._join_filter(stmt, filter_id)
 
+        result = await session.execute(stmt)
+        stats = self._collect_grouped_stats(result.all())
+        totals = stats["totals"]
 
-        if filter_id is not None:
-            by_percent_msk_cluster_stmt = (
-                by_percent_msk_cluster_stmt
-                .join(
-                    FilterTaxNumber,
-                    Person.tax_number == FilterTaxNumber.tax_number
-                )
-                .filter_by(filter_id=filter_id)
-            )
-
-        moscow_cluster_res = await session.execute(by_percent_msk_cluster_stmt)
-        cluster_data = moscow_cluster_res.first()
-
-        if cluster_data.cluster_count and cluster_data.total_count > 0:
-            cluster_percentage = (cluster_data.cluster_count / cluster_data.total_count) * 100
-            stats["moscow_cluster_percentage"] = round(cluster_percentage, 2)
-        else:
-            stats["moscow_cluster_percentage"] = 0
-
-        by_percent_msk_support_type_stmt = (
-            select(
-                func.count().filter(Person.support_type.isnot(None)).label("count"),
-                func.count().label("total_count")
-        )
-        .select_from(Person)
-        .filter(Person.region.ilike('%москва%'))
-        )
-
-        moscow_support_type_res = await session.execute(by_percent_msk_support_type_stmt)
-
-        support_type_data = moscow_support_type_res.first()
-
-        count = support_type_data.count
-        total_count = support_type_data.total_count
-
-        support_type_percentage = (count / total_count) * 100
-        stats["moscow_support_type_percentage"] = round(support_type_percentage, 2)
-
-        return stats
-
+        return {
+            "total_persons": totals.count,
+            "by_kind": stats["by_kind"],
+            "by_category": stats["by_category"],
+            "moscow_cluster_percentage": self._percentage(totals.cluster_count, totals.count),
+            "moscow_support_type_percentage": self._percentage(totals.support_type_count, totals.count),
+        }
 
     async def get_person(self, session: AsyncSession, person_tax_number: str) -> dict[str, Any]:
         """
@@ -293,15 +242,18 @@ class CRUDPerson(CRUDBase):
         Returns:
             Dict[str, Any]: Словарь с информацией о персоне, включая список патентов и количество патентов.
         """
+        # Связи лица загружаются одним запросом IN по ключу патента, без
+        # соединения и группировки; количество патентов - длина списка
         stmt = (
-            select(Person, func.count(Ownership.patent_reg_number).label("patent_count"))
-            .outerjoin(Ownership, Ownership.person_tax_number == Person.tax_number)
-            .options(selectinload(Person.ownerships).selectinload(Ownership.patent))
-            .group_by(Person.tax_number)
+            select(Person)
+            .options(
+                selectinload(Person.ownerships).load_only(Ownership.patent_kind, Ownership.patent_reg_number),
+                raiseload('*'),
+            )
             .where(Person.tax_number == person_tax_number)
         )
         result = await session.execute(stmt)
-        person, patent_count = result.unique().one_or_none()
+        person = result.scalar_one_or_none()
 
         patents = [
             {
@@ -312,7 +264,7 @@ class CRUDPerson(CRUDBase):
         ]
 
         return {
-            **person.__dict__,
+            **self.to_dict(person),
             "category": person.category,
             "patents": patents,
             "patent_count": len(patents),
@@ -1,8 +1,8 @@
-from hawkcatcher import Hawk
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 
 from prometheus_fastapi_instrumentator import Instrumentator
@@ -14,8 +14,13 @@ import sys
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
 
+from app.core.cache import RedisStorage, ResponseCacheMiddleware
 from app.core.config import settings
+from app.core.error_reporting import HawkReporter
+from app.core.db import engine
+from app.core.metrics import DBTimeMiddleware, instrument_engine
 from app.api.routers import main_router
+from app.crud.patents_export import shutdown_export_executor
 import logging
 
 # hawk = Hawk({
@@ -25,16 +30,29 @@ import logging
 # })
 
 
-app = FastAPI(title=settings.app_title)
-Instrumentator().instrument(app).expose(app)
+logging.basicConfig(level=settings.log_level)
+
+cache_storage = RedisStorage.from_url(settings.cache_redis_url)
+hawk = HawkReporter(os.getenv('HAWK_PROJECT_TOKEN'))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    hawk.start()
+    yield
+    await hawk.stop()
+    shutdown_export_executor()
+    await cache_storage.close()
+    await engine.dispose()
 
-logger = logging.getLogger(__name__)
 
-try:
-    hawk = Hawk(os.getenv('HAWK_PROJECT_TOKEN'))
-    logger.info("Hawk initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize Hawk: {e}", exc_info=True)
+app = FastAPI(title=settings.app_title, default_response_class=ORJSONResponse, lifespan=lifespan)
+app.add_middleware(ResponseCacheMiddleware, storage=cache_storage)
+app.add_middleware(DBTimeMiddleware)
+instrument_engine(engine)
+Instrumentator(excluded_handlers=['/metrics'], should_group_status_codes=False).instrument(app).expose(app)
+
+logger = logging.getLogger(__name__)
 
 app.add_middleware(
     CORSMiddleware,
@@ -45,12 +63,6 @@ app.add_middleware(
 )
 
 
-@app.middleware("http")
-async def add_cors_header(request, call_next):
-    response = await call_next(request)
-    response.headers["Access-Control-Allow-Origin"] = "*"
-    return response
-
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """
@@ -64,7 +76,7 @@ async def global_exception_handler(request: Request, exc: Exception):
         JSONResponse: Ответ с информацией об ошибке и статус-кодом 500
     """
     logger.exception(f"Unexpected error: {exc}")
-    hawk.send(exc)
+    hawk.report(exc)
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content = {
@@ -86,7 +98,7 @@ async def database_error_handler(request: Request, exc: DatabaseError):
         JSONResponse: Ответ с информацией об ошибке БД и статус-кодом 500
     """
     logger.error(f"Database error: {exc}")
-    hawk.send(exc)
+    hawk.report(exc)
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
@@ -108,7 +120,7 @@ async def operational_error_handler(request: Request, exc: OperationalError):
         JSONResponse: Ответ с сообщением о недоступности БД и статус-кодом 500
     """
     logger.error(f"Database connection error: {exc}")
-    hawk.send(exc)
+    hawk.report(exc)
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
@@ -138,7 +150,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
             "type": error["type"],
             "body": exc.body
         })
-    hawk.send(errors)
+    hawk.report(errors)
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
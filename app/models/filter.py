@@ -21,7 +21,7 @@ class Filter(Base):
     Связи:
         tax_numbers (relationship): Связь "один-ко-многим" с моделью FilterTaxNumber.
     """
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(1000), nullable=False, unique=True)
     filename = Column(String(1000), nullable=False)
     created = Column(DateTime, default=datetime.utcnow)
@@ -43,7 +43,7 @@ class FilterTaxNumber(Base):
     Связи:
         filter (relationship): Связь "многие-к-одному" с моделью Filter.
     """
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     filter_id = Column(Integer, ForeignKey('filter.id'), nullable=False)
     tax_number = Column(Text, nullable=False)
 
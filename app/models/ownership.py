@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, ForeignKeyConstraint
+from sqlalchemy import Column, Index, Integer, ForeignKey, String, ForeignKeyConstraint
 from sqlalchemy.orm import relationship
 
 from app.core.db import Base
@@ -17,18 +17,23 @@ class Ownership(Base):
 
     Ограничения:
        __table_args__: ForeignKeyConstraint, который связывает поля patent_kind и patent_reg_number
-                       с соответствующими полями в таблице 'patent'.
+                       с соответствующими полями в таблице 'patent'. Оба внешних ключа удаляют
+                       записи владения на стороне базы (ON DELETE CASCADE).
+                       Индекс ix_ownership_person_tax_number для выборок по владельцу; первичный
+                       ключ уже начинается с (patent_kind, patent_reg_number) и покрывает выборки по патенту.
     """
     patent_kind = Column(Integer, primary_key=True)
     patent_reg_number = Column(Integer, primary_key=True)
-    person_tax_number = Column(String, ForeignKey('person.tax_number'), primary_key=True)
+    person_tax_number = Column(String, ForeignKey('person.tax_number', ondelete='CASCADE'), primary_key=True)
     patent = relationship('Patent', back_populates='ownerships')
     person = relationship('Person', back_populates='ownerships')
 
     __table_args__ = (
         ForeignKeyConstraint(
             ['patent_kind', 'patent_reg_number'],
-            ['patent.kind', 'patent.reg_number']
+            ['patent.kind', 'patent.reg_number'],
+            ondelete='CASCADE'
         ),
+        Index('ix_ownership_person_tax_number', 'person_tax_number', 'patent_kind', 'patent_reg_number'),
         {},
     )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Date, String, Boolean, PrimaryKeyConstraint
+from sqlalchemy import Column, Index, Integer, Date, String, Boolean, PrimaryKeyConstraint, text
 from sqlalchemy.orm import relationship
 
 from app.core.db import Base
@@ -24,10 +24,14 @@ class Patent(Base):
        region (str): Регион, связанный с патентом.
        city (str): Город, связанный с патентом.
        author_count (int): Количество авторов патента.
-       ownerships (list[Ownership]): Связь с моделью Ownership, с каскадным удалением.
+       ownerships (list[Ownership]): Связь с моделью Ownership. Каскадное удаление выполняет база
+                                     (ON DELETE CASCADE), коллекция перед удалением не загружается.
+                                     Ленивая загрузка запрещена (raise_on_sql): связь загружается
+                                     только явно, например selectinload в запросе.
 
     Ограничения:
        __table_args__: PrimaryKeyConstraint, который связывает поля kind и reg_number.
+                       Частичный индекс ix_patent_country_ru по российским патентам для статистики.
     """
     reg_number = Column(Integer, nullable=False, index=True)
     reg_date = Column(Date)
@@ -47,10 +51,13 @@ class Patent(Base):
     patent_starting_date = Column(Date, nullable=False)
     publication_url = Column(String(length=255))
 
-    ownerships = relationship('Ownership', back_populates='patent', cascade="all, delete-orphan")
+    ownerships = relationship(
+        'Ownership', back_populates='patent', cascade="all", passive_deletes=True, lazy='raise_on_sql'
+    )
 
     __table_args__ = (
         PrimaryKeyConstraint('kind', 'reg_number'),
+        Index('ix_patent_country_ru', 'kind', 'reg_number', postgresql_where=text("country_code = 'RU'")),
         {},
     )
 
@@ -1,6 +1,4 @@
-from enum import unique
-
-from sqlalchemy import Column, Integer, Date, String, Boolean, SmallInteger
+from sqlalchemy import Column, Computed, Index, Integer, Date, String, Boolean, SmallInteger, text, true
 from sqlalchemy.orm import relationship
 
 from app.core.db import Base
@@ -12,35 +10,60 @@ class Person(Base):
 
     Атрибуты:
        kind (int): Тип лица.
-       tax_number (str): Налоговый номер лица. Уникальный и индексируемый столбец. Первичный ключ.
+       tax_number (str): Налоговый номер лица. Первичный ключ.
        full_name (str): Полное имя лица.
        short_name (str): Сокращенное имя лица.
        legal_address (str): Юридический адрес лица.
        fact_address (str): Фактический адрес лица.
        reg_date (Date): Дата регистрации лица.
-       active (bool): Флаг активности лица, по умолчанию True.
+       active (bool): Флаг активности лица, по умолчанию True. Не может быть пустым.
        category (str): Категория лица.
        okopf (str | None): Код ОКОПФ
        okvad (str | None): Код ОКВЭД
        region (str | None): Регион регистрации
        uk (int): Признак участника кластера (1 - участник, 0 - нет)
        support_type (str | None): Тип поддержки
-       ownerships (list[Ownership]): Связь с моделью Ownership, с каскадным удалением.
+       is_moscow (bool): Признак регистрации в Москве, вычисляется из region при записи.
+       ownerships (list[Ownership]): Связь с моделью Ownership. Каскадное удаление выполняет база
+                                     (ON DELETE CASCADE), коллекция перед удалением не загружается.
+                                     Ленивая загрузка запрещена (raise_on_sql): связь загружается
+                                     только явно, например selectinload в запросе.
     """
+    # Колонки фиксированной длины объявлены первыми, строки переменной длины
+    # после них: порядок совпадает с физическим и не дает байтов выравнивания
     kind = Column(Integer, nullable=False)
-    tax_number = Column(String, unique=True, index=True, primary_key=True)
+    reg_date = Column(Date)
+    uk = Column(SmallInteger, nullable=False, comment="Участник кластера(uk=1-участник, uk=0-нет)")
+    active = Column(Boolean, nullable=False, server_default=true())
+    is_moscow = Column(
+        Boolean,
+        Computed("region ILIKE '%москва%'", persisted=True),
+        comment="Регион содержит 'москва'"
+    )
+    tax_number = Column(String, primary_key=True)
+    ogrn = Column(String, unique=True, nullable=False, comment="ОГРН организации")
     full_name = Column(String)
     short_name = Column(String)
     legal_address = Column(String)
     fact_address = Column(String)
-    reg_date = Column(Date)
-    active = Column(Boolean, default=True)
     category = Column(String)
     okopf = Column(String)
     okvad = Column(String)
     region = Column(String)
-    ogrn = Column(String, unique=True, nullable=False, comment="ОГРН организации")
-    uk = Column(SmallInteger, nullable=False, comment="Участник кластера(uk=1-участник, uk=0-нет)")
     support_type = Column(String)
 
-    ownerships = relationship('Ownership', back_populates='person', cascade="all, delete-orphan")
\ No newline at end of file
+    ownerships = relationship(
+        'Ownership', back_populates='person', cascade="all", passive_deletes=True, lazy='raise_on_sql'
+    )
+
+    __table_args__ = (
+        # Покрывающие индексы статистики: группировки по kind и category
+        # и соединение с фильтром по tax_number выполняются index-only scan
+        Index('ix_person_kind_category', 'kind', 'category', postgresql_include=['tax_number']),
+        Index(
+            'ix_person_moscow_stats', 'kind', 'category',
+            postgresql_include=['tax_number', 'uk', 'support_type'],
+            postgresql_where=is_moscow,
+        ),
+        Index('ix_person_active_partial', 'kind', postgresql_where=text('active')),
+    )
\ No newline at end of file
@@ -1,12 +1,47 @@
+import asyncio
 import re
-from io import BytesIO
 
-import aiofiles
 import openpyxl
 from fastapi import HTTPException
 from starlette.responses import FileResponse
 
 
+def _process_workbook(source, output_path: str) -> None:
+    """
+    Построчно обрабатывает книгу Excel с патентами и сохраняет результат.
+
+    Исходная книга открывается в режиме read_only, итоговая создается в режиме
+    write_only, поэтому в памяти одновременно находится только текущая строка.
+
+    Args:
+        source: Путь или файловый объект с исходной книгой Excel.
+        output_path (str): Путь для сохранения обработанной книги.
+    """
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+
+        output_workbook = openpyxl.Workbook(write_only=True)
+        output_sheet = output_workbook.create_sheet()
+        output_sheet.append(["registration_number", "patent_holders", "holder_count"])
+
+        for row in sheet.iter_rows(min_row=2, values_only=True):
+            registration_number = row[0]
+            patent_holders = row[6]
+            if patent_holders:
+                holder_list = [re.sub(r'\s*\(RU\)$', '', holder.strip() + ')') for holder in patent_holders.split(')')[:-1]]
+
+                output_sheet.append([
+                    registration_number,
+                    ", ".join(holder_list),
+                    len(holder_list)
+                ])
+
+        output_workbook.save(output_path)
+    finally:
+        workbook.close()
+
+
 async def create_upload_file(file) -> FileResponse:
     """
      Асинхронная функция для обработки загруженного файла Excel с данными о патентах.
@@ -22,57 +57,21 @@ async def create_upload_file(file) -> FileResponse:
 
      Эта функция выполняет следующие действия:
      1. Проверяет формат загруженного файла. Если формат не соответствует формату Excel, выбрасывается исключение HTTPException.
-     2. Читает содержимое загруженного файла.
-     3. Загружает рабочую книгу Excel из содержимого файла.
-     4. Обрабатывает данные из активного листа рабочей книги.
-     5. Создает новую рабочую книгу Excel и записывает в нее обработанные данные.
-     6. Сохраняет новую рабочую книгу в файловый поток.
-     7. Асинхронно записывает содержимое файлового потока в новый файл на диске.
-     8. Возвращает FileResponse с созданным файлом Excel.
+     2. Открывает загруженный файл в режиме read_only без чтения всего содержимого в память.
+     3. Построчно обрабатывает данные из активного листа рабочей книги.
+     4. Записывает обработанные строки в новую рабочую книгу в режиме write_only.
+     5. Сохраняет новую рабочую книгу в файл на диске.
+     Разбор выполняется в пуле потоков, чтобы не блокировать цикл событий.
      """
     if file.content_type != 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet':
         raise HTTPException(status_code=400, detail="Данный формат файла не поддерживается.")
 
     try:
-        content = await file.read()
-        workbook = openpyxl.load_workbook(BytesIO(content))
-        sheet = workbook.active
-
-        results = []
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            registration_number = row[0]
-            patent_holders = row[6]
-            if patent_holders:
-                holder_list = [re.sub(r'\s*\(RU\)$', '', holder.strip() + ')') for holder in patent_holders.split(')')[:-1]]
-
-                holder_count = len(holder_list)
-                results.append({
-                    "registration_number": registration_number,
-                    "patent_holders": holder_list,
-                    "holder_count": holder_count
-                })
-
-        output_workbook = openpyxl.Workbook()
-        output_sheet = output_workbook.active
-        output_sheet.append(["registration_number", "patent_holders", "holder_count"])
-
-        for result in results:
-            output_sheet.append([
-                result["registration_number"],
-                ", ".join(result["patent_holders"]),
-                result["holder_count"]
-            ])
-
         output_path = "updated_patents.xlsx"
 
-        output_stream = BytesIO()
-        output_workbook.save(output_stream)
-        output_stream.seek(0)
-
-        async with aiofiles.open(output_path, 'wb') as f:
-            await f.write(output_stream.getvalue())
-
-        output_stream.seek(0)
+        # UploadFile уже буферизован Starlette во временный файл (в памяти до 1 МБ, далее на диске)
+        await file.seek(0)
+        await asyncio.to_thread(_process_workbook, file.file, output_path)
 
         return dict(status="OK")
     except Exception as e:
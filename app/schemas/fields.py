@@ -0,0 +1,30 @@
+"""Общие аннотации полей схем."""
+from datetime import date
+from enum import IntEnum
+from typing import Annotated, Optional, Type, Union
+
+from pydantic import Field
+
+# Необязательные поля: отсутствующее значение принимается за None
+OptStr = Annotated[Optional[str], Field(default=None)]
+OptDate = Annotated[Optional[date], Field(default=None)]
+
+
+def kind_from_row(enum_cls: Type[IntEnum], value: int) -> Union[IntEnum, int]:
+    """
+    Приводит вид из строки базы к перечислению для ответов без валидации.
+
+    В базе могут быть виды, которых нет в перечислении; такие значения
+    отдаются как есть, а не прерывают чтение ошибкой.
+
+    Args:
+        enum_cls (Type[IntEnum]): Перечисление видов.
+        value (int): Значение колонки kind.
+
+    Returns:
+        Union[IntEnum, int]: Элемент перечисления или исходное значение.
+    """
+    try:
+        return enum_cls(value)
+    except ValueError:
+        return value
@@ -1,8 +1,12 @@
+from dataclasses import dataclass
 from datetime import date
 from enum import IntEnum
-from typing import Dict, List, Optional
+from typing import Annotated, Any, List, Mapping, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, BeforeValidator, ConfigDict, TypeAdapter
+
+from app.schemas.fields import OptDate, OptStr, kind_from_row
+from app.schemas.person import StatItem
 
 
 class KindEnum(IntEnum):
@@ -17,59 +21,163 @@ class KindEnum(IntEnum):
     INDUSTRIAL_DESIGN = 3
 
 
-class PatentHolder(BaseModel):
+@dataclass(slots=True, frozen=True)
+class PatentHolder:
+    """
+    Владелец патента в ответе.
+
+    Обычный dataclass со __slots__ вместо BaseModel: владельцев в списке
+    патентов много, а экземпляр без __dict__ и служебных полей pydantic
+    меньше и создается без валидации. Входные данные pydantic по-прежнему
+    валидирует как поле list[PatentHolder].
+    """
     full_name: str
     tax_number: str
 
 
 class PatentBase(BaseModel):
     reg_number: int
-    reg_date: Optional[date] = None
-    appl_date: Optional[date] = None
-    owner_raw: Optional[str] = None
-    address: Optional[str] = None
+    reg_date: OptDate
+    appl_date: OptDate
+    owner_raw: OptStr
+    address: OptStr
     name: str
-    actual: bool | str
-    subcategory: Optional[str] = None
-    kind: int
-    country_code: Optional[str] = None
-    region: Optional[str] = None
-    city: Optional[str] = None
-    appl_number: Optional[str] = None
+    actual: bool
+    subcategory: OptStr
+    kind: KindEnum
+    country_code: OptStr
+    region: OptStr
+    city: OptStr
+    appl_number: OptStr
     patent_starting_date: date
-    publication_url: Optional[str] = None
-    # @field_validator('kind')
-    # @classmethod
-    # def check_kind_value(cls, value: int):
-    #     if value not in KindEnum.__members__.values():
-    #         raise ValueError('Можно использовать только цифры от 1 до 3')
-    #     return value
+    publication_url: OptStr
+
+
+# Значения actual из выгрузок, которые не распознает парсер bool pydantic
+_ACTUAL_TOKENS = {'active': True, 'inactive': False}
+
+
+def _parse_actual(value):
+    """
+    Приводит токены active/inactive из входных данных к bool.
+
+    Остальные значения проверяет стандартный парсер bool pydantic, поэтому
+    опечатки вроде "ture" дают ошибку валидации, а не недействующий патент.
+    """
+    if isinstance(value, str):
+        token = value.strip().casefold()
+        if token in _ACTUAL_TOKENS:
+            return _ACTUAL_TOKENS[token]
+    return value
+
+
+ActualFlag = Annotated[bool, BeforeValidator(_parse_actual)]
 
 
 class PatentCreate(PatentBase):
-    pass
+    actual: ActualFlag
 
 
 class PatentUpdate(PatentBase):
-    pass
+    actual: ActualFlag
+
+
+# Поля PatentBase, которые from_row переносит из строки без преобразования
+_PATENT_ROW_FIELDS = tuple(name for name in PatentBase.model_fields if name != 'kind')
+
+
+class PatentListItem(PatentBase):
+    """Патент в списке: только колонки таблицы, без владельцев."""
+
+    model_config = ConfigDict(from_attributes=True, extra='ignore', validate_assignment=False, frozen=True)
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> 'PatentListItem':
+        """
+        Строит элемент списка из строки выборки без валидации.
+
+        Args:
+            row (Mapping[str, Any]): Колонки патента.
+
+        Returns:
+            PatentListItem: Схема элемента списка патентов.
+        """
+        return cls.model_construct(
+            **{name: row[name] for name in _PATENT_ROW_FIELDS},
+            kind=kind_from_row(KindEnum, row["kind"]),
+        )
 
 
 class PatentAdditionalFields(PatentBase):
     patent_holders: list[PatentHolder]
 
+    model_config = ConfigDict(from_attributes=True, extra='ignore', validate_assignment=False, frozen=True)
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> 'PatentAdditionalFields':
+        """
+        Строит ответ из строки выборки без валидации.
 
-    class Config:
-        orm_mode = True
+        Читаются только объявленные поля схемы; значения приходят из базы и
+        уже имеют нужные типы, поэтому используется model_construct.
+
+        Args:
+            row (Mapping[str, Any]): Колонки патента и список владельцев patent_holders.
+
+        Returns:
+            PatentAdditionalFields: Схема ответа с данными патента.
+        """
+        return cls.model_construct(
+            **{name: row[name] for name in _PATENT_ROW_FIELDS},
+            kind=kind_from_row(KindEnum, row["kind"]),
+            patent_holders=[PatentHolder(**holder) for holder in row["patent_holders"]],
+        )
 
 
 class PatentDB(PatentBase):
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True, extra='ignore', validate_assignment=False, frozen=True)
+
+
+class PatentCursor(BaseModel):
+    kind: int
+    reg_number: int
 
 
 class PatentsList(BaseModel):
     total: int
-    items: Optional[List[PatentAdditionalFields]]
+    items: Optional[List[PatentListItem]]
+    next_cursor: Optional[PatentCursor] = None
+
+    @classmethod
+    def from_rows(cls, page: Mapping[str, Any]) -> 'PatentsList':
+        """
+        Строит страницу списка из результата CRUD без валидации.
+
+        Args:
+            page (Mapping[str, Any]): Словарь с ключами total, items и next_cursor.
+
+        Returns:
+            PatentsList: Схема ответа со страницей патентов.
+        """
+        cursor = page["next_cursor"]
+        return cls.model_construct(
+            total=page["total"],
+            items=[PatentListItem.from_row(item) for item in page["items"]],
+            next_cursor=PatentCursor.model_construct(**cursor) if cursor is not None else None,
+        )
+
+
+
+class ExportTask(BaseModel):
+    task_id: str
+
+
+class ExportTaskStatus(BaseModel):
+    status: str
+
+class KindStatItem(BaseModel):
+    kind: int
+    count: int
 
 
 class PatentsStats(BaseModel):
@@ -79,5 +187,29 @@ class PatentsStats(BaseModel):
     total_ru_with_holders: int
     with_holders_percent: int
     ru_with_holders_percent: int
-    by_author_count: Dict[str, int]
-    by_patent_kind: Dict[int, int]
+    by_author_count: List[StatItem]
+    by_patent_kind: List[KindStatItem]
+
+    @classmethod
+    def build_trusted(cls, **data: Any) -> 'PatentsStats':
+        """
+        Строит ответ из агрегатов, посчитанных сервером, без валидации.
+
+        Только для ответов: данные запросов всегда проходят обычную валидацию.
+
+        Args:
+            data: Итоги и распределения из PatentCRUD.get_stats.
+
+        Returns:
+            PatentsStats: Схема ответа со статистикой.
+        """
+        by_author_count = [StatItem.model_construct(**item) for item in data.pop('by_author_count')]
+        by_patent_kind = [KindStatItem.model_construct(**item) for item in data.pop('by_patent_kind')]
+        return cls.model_construct(**data, by_author_count=by_author_count, by_patent_kind=by_patent_kind)
+
+
+# Скомпилированные валидаторы и JSON-сериализаторы ответов
+patents_list_adapter = TypeAdapter(PatentsList)
+patent_adapter = TypeAdapter(PatentAdditionalFields)
+patents_stats_adapter = TypeAdapter(PatentsStats)
+
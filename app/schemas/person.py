@@ -1,8 +1,10 @@
 from enum import IntEnum
 
-from pydantic import BaseModel
-from typing import Dict, List, Optional
-from datetime import date
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+from typing import Any, Dict, List, Mapping
+from dataclasses import dataclass
+
+from app.schemas.fields import OptDate, OptStr, kind_from_row
 
 
 class PersonKindEnum(IntEnum):
@@ -18,26 +20,20 @@ class PersonKindEnum(IntEnum):
 
 
 class PersonBase(BaseModel):
-    kind: int
+    kind: PersonKindEnum
     tax_number: str
-    full_name: Optional[str]
-    short_name: Optional[str]
-    legal_address: Optional[str]
-    fact_address: Optional[str]
-    reg_date: Optional[date]
+    full_name: OptStr
+    short_name: OptStr
+    legal_address: OptStr
+    fact_address: OptStr
+    reg_date: OptDate
     active: bool
-    okopf: Optional[str]
-    okvad: Optional[str]
+    okopf: OptStr
+    okvad: OptStr
     ogrn: str
-    region: Optional[str]
+    region: OptStr
     uk: int
-    support_type: Optional[str]
-    # @field_validator('kind')
-    # @classmethod
-    # def check_kind_value(cls, value: int):
-    #     if value not in PersonKindEnum.__members__.values():
-    #         raise ValueError('Можно использовать только цифры от 1 до 3')
-    #     return value
+    support_type: OptStr
 
 
 class PersonCreate(PersonBase):
@@ -48,23 +44,49 @@ class PersonUpdate(PersonBase):
     pass
 
 
-class PersonPatents(BaseModel):
+@dataclass(slots=True, frozen=True)
+class PersonPatents:
+    """Ключ патента лица в ответе; dataclass со __slots__, создается без валидации."""
     kind: int
     reg_number: int
 
 
+# Поля PersonBase, которые from_row переносит из строки без преобразования
+_PERSON_ROW_FIELDS = tuple(name for name in PersonBase.model_fields if name != 'kind')
+
+
 class PersonAdditionalFields(PersonBase):
     category: str
     patents: list[PersonPatents] = []
     patent_count: int = 0
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True, extra='ignore', validate_assignment=False, frozen=True)
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> 'PersonAdditionalFields':
+        """
+        Строит ответ из данных лица без валидации.
+
+        Читаются только объявленные поля схемы; значения приходят из базы и
+        уже имеют нужные типы, поэтому используется model_construct.
+
+        Args:
+            row (Mapping[str, Any]): Колонки лица, category, patents и patent_count.
+
+        Returns:
+            PersonAdditionalFields: Схема ответа с данными лица.
+        """
+        return cls.model_construct(
+            **{name: row[name] for name in _PERSON_ROW_FIELDS},
+            kind=kind_from_row(PersonKindEnum, row["kind"]),
+            category=row["category"],
+            patents=[PersonPatents(**patent) for patent in row["patents"]],
+            patent_count=row["patent_count"],
+        )
 
 
 class PersonDB(PersonBase):
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True, extra='ignore', validate_assignment=False, frozen=True)
 
 class StatItem(BaseModel):
     name: str
@@ -75,8 +97,24 @@ class PersonsList(BaseModel):
     okvad_stats: List[StatItem]
     mpk_stats: List[StatItem]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+    @classmethod
+    def build_trusted(cls, **data: List[Mapping[str, Any]]) -> 'PersonsList':
+        """
+        Строит ответ из агрегатов, посчитанных сервером, без валидации.
+
+        Только для ответов: данные запросов всегда проходят обычную валидацию.
+
+        Args:
+            data: Списки словарей {name, count} для okopf_stats, okvad_stats и mpk_stats.
+
+        Returns:
+            PersonsList: Схема ответа со статистикой.
+        """
+        return cls.model_construct(**{
+            field: [StatItem.model_construct(**item) for item in items] for field, items in data.items()
+        })
 
 class PersonsMskStats(BaseModel):
     total_persons: int
@@ -85,10 +123,34 @@ class PersonsMskStats(BaseModel):
     moscow_cluster_percentage: float
     moscow_support_type_percentage: float
 
+    @classmethod
+    def build_trusted(cls, **data: Any) -> 'PersonsMskStats':
+        """
+        Строит ответ из агрегатов, посчитанных сервером, без валидации.
+
+        Только для ответов: данные запросов всегда проходят обычную валидацию.
+        """
+        return cls.model_construct(**data)
+
 class PersonsAllStats(BaseModel):
     total_persons: int
     by_kind: Dict[int, int]
     by_category: Dict[str, int]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+    @classmethod
+    def build_trusted(cls, **data: Any) -> 'PersonsAllStats':
+        """
+        Строит ответ из агрегатов, посчитанных сервером, без валидации.
+
+        Только для ответов: данные запросов всегда проходят обычную валидацию.
+        """
+        return cls.model_construct(**data)
+
+
+# Скомпилированные валидаторы и JSON-сериализаторы ответов
+persons_list_adapter = TypeAdapter(PersonsList)
+persons_msk_stats_adapter = TypeAdapter(PersonsMskStats)
+persons_all_stats_adapter = TypeAdapter(PersonsAllStats)
+person_adapter = TypeAdapter(PersonAdditionalFields)
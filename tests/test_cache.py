@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.cache import CacheConfig, CacheDropConfig, ResponseCacheMiddleware
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ResponseCacheMiddleware)
+    app.state.items = []
+
+    @app.get('/patents', dependencies=[Depends(CacheConfig(max_age=60))])
+    async def list_items():
+        return {'items': list(app.state.items)}
+
+    @app.post('/patents', status_code=201, dependencies=[Depends(CacheDropConfig(paths=['/patents*']))])
+    async def create_item(name: str):
+        app.state.items.append(name)
+        return {'name': name}
+
+    @app.delete('/patents/{name}', status_code=204, dependencies=[Depends(CacheDropConfig(paths=['/patents*']))])
+    async def delete_item(name: str):
+        app.state.items.remove(name)
+
+    return app
+
+
+class ResponseCacheMiddlewareTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(create_app())
+
+    def test_get_after_write_sees_new_data(self):
+        self.assertEqual(self.client.get('/patents').json(), {'items': []})
+
+        self.assertEqual(self.client.post('/patents', params={'name': 'a'}).status_code, 201)
+        self.assertEqual(self.client.get('/patents').json(), {'items': ['a']})
+
+        self.assertEqual(self.client.delete('/patents/a').status_code, 204)
+        self.assertEqual(self.client.get('/patents').json(), {'items': []})
+
+    def test_failed_write_keeps_cached_response(self):
+        first = self.client.get('/patents')
+        self.assertEqual(self.client.post('/patents').status_code, 422)
+        self.assertEqual(self.client.get('/patents').headers['etag'], first.headers['etag'])
+
+    def test_cache_dropped_before_write_response_is_sent(self):
+        self.client.get('/patents')
+        middleware = self.client.app.middleware_stack
+        while not isinstance(middleware, ResponseCacheMiddleware):
+            middleware = middleware.app
+        self.assertTrue(middleware.storage._data)
+
+        cached_when_sent = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.body' and not message.get('more_body', False):
+                cached_when_sent.append(bool(middleware.storage._data))
+
+        scope = {
+            'type': 'http', 'method': 'POST', 'path': '/patents', 'raw_path': b'/patents',
+            'query_string': b'name=a', 'headers': [], 'root_path': '', 'scheme': 'http',
+            'server': ('testserver', 80), 'client': ('testclient', 50000), 'http_version': '1.1',
+        }
+        asyncio.run(self.client.app(scope, receive, send))
+        self.assertEqual(cached_when_sent, [False])
+
+
+if __name__ == '__main__':
+    unittest.main()
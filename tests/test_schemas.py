@@ -0,0 +1,59 @@
+import unittest
+import warnings
+from datetime import date
+
+import orjson
+
+from app.schemas.patent import (
+    KindEnum,
+    PatentAdditionalFields,
+    PatentsList,
+    patent_adapter,
+    patents_list_adapter,
+)
+from app.schemas.person import PersonAdditionalFields, PersonKindEnum, person_adapter
+
+PATENT_ROW = {
+    'reg_number': 1001, 'reg_date': date(2020, 1, 2), 'appl_date': None, 'owner_raw': None,
+    'address': None, 'name': 'Patent', 'actual': True, 'subcategory': None, 'kind': 1,
+    'country_code': 'RU', 'region': None, 'city': None, 'appl_number': None,
+    'patent_starting_date': date(2019, 1, 1), 'publication_url': None,
+}
+
+PERSON_ROW = {
+    'kind': 1, 'tax_number': '7700000001', 'full_name': 'Org', 'short_name': 'Org',
+    'legal_address': None, 'fact_address': None, 'reg_date': None, 'active': True,
+    'okopf': None, 'okvad': None, 'ogrn': '1', 'region': None, 'uk': 0, 'support_type': None,
+    'category': 'Малое', 'patents': [{'kind': 1, 'reg_number': 1001}], 'patent_count': 1,
+}
+
+
+def dump(adapter, value) -> dict:
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return orjson.loads(adapter.dump_json(value))
+
+
+class FromRowKindTest(unittest.TestCase):
+
+    def test_known_kind_becomes_enum(self):
+        patent = PatentAdditionalFields.from_row({**PATENT_ROW, 'patent_holders': []})
+        person = PersonAdditionalFields.from_row(PERSON_ROW)
+
+        self.assertIs(patent.kind, KindEnum.INVENTION)
+        self.assertIs(person.kind, PersonKindEnum.LEGAL_ENTITY)
+
+    def test_out_of_range_kind_is_served_as_is(self):
+        page = PatentsList.from_rows({
+            'total': 1, 'items': [{**PATENT_ROW, 'kind': 9}], 'next_cursor': None,
+        })
+        patent = PatentAdditionalFields.from_row({**PATENT_ROW, 'kind': 9, 'patent_holders': []})
+        person = PersonAdditionalFields.from_row({**PERSON_ROW, 'kind': 9})
+
+        self.assertEqual(dump(patents_list_adapter, page)['items'][0]['kind'], 9)
+        self.assertEqual(dump(patent_adapter, patent)['kind'], 9)
+        self.assertEqual(dump(person_adapter, person)['kind'], 9)
+
+
+if __name__ == '__main__':
+    unittest.main()